@@ -0,0 +1,175 @@
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from typing import Optional, Dict, List, Tuple
+
+DEFAULT_ALERT_DB = os.path.join(os.path.expanduser("~"), ".cache", "zonealert", "alerts.sqlite3")
+
+class AlertStore:
+    """
+    Persistent alert state: cooldown index plus full alert history
+    
+    The cooldown index maps (symbol, zone type, level rounded to level_precision
+    decimals, recipient) to the time of the last alert for that zone, so each recipient
+    has its own cooldowns. It is held in a dict, so a cooldown check is O(1), and
+    written through to SQLite so cooldowns survive restarts.
+    Every alert raised is appended to a separate history table that is never truncated.
+    One store can be shared by several threads (e.g. the dashboard and ZoneMonitor).
+    """
+    
+    def __init__(self, path: Optional[str] = None, level_precision: int = 2):
+        self.path = path or os.getenv("ALERT_DB_PATH", DEFAULT_ALERT_DB)
+        self.level_precision = level_precision
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        if "recipient" not in self._columns("alert_state"):
+            # Cooldowns from before they were kept per recipient; they are short-lived, so start over
+            self._conn.execute("DROP TABLE IF EXISTS alert_state")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS alert_state (
+                symbol TEXT NOT NULL,
+                zone_type TEXT NOT NULL,
+                level_key REAL NOT NULL,
+                recipient TEXT NOT NULL,
+                last_alert REAL NOT NULL,
+                PRIMARY KEY (symbol, zone_type, level_key, recipient)
+            ) WITHOUT ROWID
+        """)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS alert_history (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                timestamp TEXT NOT NULL,
+                symbol TEXT NOT NULL,
+                zone_type TEXT,
+                zone_level REAL,
+                current_price REAL,
+                distance_pct REAL,
+                message TEXT,
+                email_sent INTEGER NOT NULL DEFAULT 0,
+                recipient TEXT
+            )
+        """)
+        if "recipient" not in self._columns("alert_history"):
+            self._conn.execute("ALTER TABLE alert_history ADD COLUMN recipient TEXT")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS alert_history_symbol ON alert_history (symbol, id)")
+        
+        # Hot cooldown index: key -> POSIX time of the last alert
+        self._last_alert = {(symbol, zone_type, level_key, recipient): last_alert
+                            for symbol, zone_type, level_key, recipient, last_alert in self._conn.execute(
+                                "SELECT symbol, zone_type, level_key, recipient, last_alert FROM alert_state")}
+    
+    def zone_key(self, symbol: str, zone_type: str, level: float, recipient: str = "") -> Tuple[str, str, float, str]:
+        """Cooldown key of a zone; levels are rounded so float noise maps to the same zone"""
+        return (symbol, zone_type, round(float(level), self.level_precision), recipient or "")
+    
+    def in_cooldown(self, symbol: str, zone_type: str, level: float, cooldown: timedelta,
+                    now: Optional[datetime] = None, recipient: str = "") -> bool:
+        """Whether the zone alerted recipient less than cooldown ago"""
+        now = now or datetime.now()
+        with self._lock:
+            last_alert = self._last_alert.get(self.zone_key(symbol, zone_type, level, recipient))
+        return last_alert is not None and now.timestamp() - last_alert <= cooldown.total_seconds()
+    
+    def try_acquire(self, symbol: str, zone_type: str, level: float, cooldown: timedelta,
+                    now: Optional[datetime] = None, recipient: str = "") -> bool:
+        """
+        Claim an alert for a zone
+        
+        Args:
+            recipient: Whose cooldown to check, e.g. an email address; recipients don't
+                hold back each other's alerts
+        
+        Returns:
+            True (and the zone's cooldown restarts at now) if the zone is not in cooldown,
+            False otherwise
+        """
+        now = (now or datetime.now()).timestamp()
+        key = self.zone_key(symbol, zone_type, level, recipient)
+        with self._lock:
+            last_alert = self._last_alert.get(key)
+            if last_alert is not None and now - last_alert <= cooldown.total_seconds():
+                return False
+            
+            self._last_alert[key] = now
+            self._conn.execute("INSERT OR REPLACE INTO alert_state (symbol, zone_type, level_key, recipient, last_alert) "
+                               "VALUES (?, ?, ?, ?, ?)", (*key, now))
+        return True
+    
+    def record_alert(self, alert: Dict):
+        """Append an alert dictionary (as built by check_alerts / ZoneMonitor) to the history"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO alert_history (timestamp, symbol, zone_type, zone_level, current_price, "
+                "distance_pct, message, email_sent, recipient) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (alert.get('timestamp') or datetime.now().isoformat(), alert['symbol'], alert.get('zone_type'),
+                 _optional_float(alert.get('zone_level')), _optional_float(alert.get('current_price')),
+                 _optional_float(alert.get('distance_pct')), alert.get('message'),
+                 int(bool(alert.get('email_sent'))), alert.get('recipient'))
+            )
+    
+    def get_alerts(self, limit: Optional[int] = None, symbol: Optional[str] = None) -> List[Dict]:
+        """
+        Alert history, oldest first
+        
+        Args:
+            limit: Only the most recent limit alerts
+            symbol: Only alerts for this symbol
+        """
+        query = "SELECT timestamp, symbol, message, zone_type, zone_level, current_price, distance_pct, email_sent, " \
+                "recipient FROM alert_history"
+        params = []
+        if symbol is not None:
+            query += " WHERE symbol = ?"
+            params.append(symbol)
+        query += " ORDER BY id DESC"
+        if limit:
+            query += " LIMIT ?"
+            params.append(int(limit))
+        
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        
+        columns = ('timestamp', 'symbol', 'message', 'zone_type', 'zone_level', 'current_price', 'distance_pct',
+                   'email_sent', 'recipient')
+        alerts = [dict(zip(columns, row)) for row in reversed(rows)]
+        for alert in alerts:
+            alert['email_sent'] = bool(alert['email_sent'])
+        return alerts
+    
+    def purge_cooldowns(self, older_than: timedelta) -> int:
+        """Drop index entries whose last alert is older than older_than; returns how many"""
+        cutoff = datetime.now().timestamp() - older_than.total_seconds()
+        with self._lock:
+            expired = [key for key, last_alert in self._last_alert.items() if last_alert < cutoff]
+            for key in expired:
+                del self._last_alert[key]
+            self._conn.execute("DELETE FROM alert_state WHERE last_alert < ?", (cutoff,))
+        return len(expired)
+    
+    def clear(self):
+        """Remove all cooldowns and history"""
+        with self._lock:
+            self._last_alert.clear()
+            self._conn.execute("DELETE FROM alert_state")
+            self._conn.execute("DELETE FROM alert_history")
+    
+    def close(self):
+        with self._lock:
+            self._conn.close()
+    
+    def _columns(self, table: str) -> List[str]:
+        """Column names of a table, empty if it doesn't exist"""
+        return [row[1] for row in self._conn.execute(f"PRAGMA table_info({table})")]
+    
+    def __len__(self) -> int:
+        """Number of zones in the cooldown index"""
+        return len(self._last_alert)
+
+def _optional_float(value) -> Optional[float]:
+    return None if value is None else float(value)
@@ -5,12 +5,18 @@ import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import yfinance as yf
 from datetime import datetime, timedelta
-import time
 import threading
+import sqlite3
+from streamlit import runtime
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 from zone_detector import ZoneDetector
 from notification_manager import NotificationManager
 from data_manager import DataManager
+from async_data_manager import AsyncDataManager
 from breakout_detector import BreakoutDetector
+from zone_monitor import ZoneMonitor
+from alert_store import AlertStore
+from zone_index import ZoneIndex
 
 # Page configuration
 st.set_page_config(
@@ -27,9 +33,64 @@ if 'monitored_stocks' not in st.session_state:
     st.session_state.monitored_stocks = []
 if 'notification_manager' not in st.session_state:
     st.session_state.notification_manager = NotificationManager()
+if 'zone_index' not in st.session_state:
+    st.session_state.zone_index = ZoneIndex()
+if 'indexed_zones' not in st.session_state:
+    st.session_state.indexed_zones = {}  # symbol -> copy of the zones last put in zone_index
 if 'last_update' not in st.session_state:
     st.session_state.last_update = datetime.now()
 
+@st.cache_resource
+def get_data_manager():
+    """One DataManager per process, so every session and rerun shares its cache and store"""
+    return DataManager()
+
+@st.cache_resource
+def get_async_data_manager():
+    """
+    One AsyncDataManager per process over the shared DataManager
+    
+    Each run drives its own asyncio.run loop, so coalescing only joins the HTF fetches of
+    that run; another session's fetch of the same series waits on DataManager's per-key
+    fetch lock and then reads the cache instead.
+    """
+    return AsyncDataManager(get_data_manager())
+
+@st.cache_resource
+def get_zone_detector():
+    """One ZoneDetector per process, so its memoized zones survive reruns and filter changes"""
+    return ZoneDetector()
+
+@st.cache_resource
+def get_breakout_detector():
+    """One tail-only BreakoutDetector per process, so its running ATH cache survives reruns"""
+    return BreakoutDetector(tail_only=True)
+
+@st.cache_resource
+def get_alert_store():
+    """Process-wide alert cooldowns and history, persisted across restarts"""
+    try:
+        return AlertStore()
+    except (OSError, sqlite3.Error):
+        return AlertStore(":memory:")  # Read-only filesystem etc. - keep state for this process only
+
+@st.cache_resource
+def get_zone_monitor():
+    """Process-wide background monitor for the monitored stocks, polling every 30 seconds"""
+    monitor = ZoneMonitor(get_data_manager(), interval=30, alert_store=get_alert_store(),
+                          subscriber_alive=session_is_active)
+    monitor.start()
+    return monitor
+
+def get_session_id():
+    """Id of the current browser session; the zone monitor keeps each session's watches under it"""
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx else "default"
+
+def session_is_active(session_id):
+    """Whether a browser session is still open, so the zone monitor can drop watches of closed ones"""
+    return runtime.exists() and runtime.get_instance().is_active_session(session_id)
+
 def main():
     st.title("📈 Stock Trading Dashboard")
     st.markdown("### Demand and Supply Zone Analysis with Real-time Notifications")
@@ -147,15 +208,19 @@ def main():
         
         email = ""
         alert_distance = 1.0
+        digest_window = 60
         
         if enable_alerts:
             email = st.text_input("Email for Notifications", 
                                 placeholder="your.email@example.com")
             alert_distance = st.slider("Alert Distance (%)", 0.1, 5.0, 1.0, 0.1,
                                      help="Alert when price is within this % of a zone")
+            digest_window = st.slider("Email Digest Window (s)", 0, 300, 60, 15,
+                                    help="Combine alerts raised within this many seconds into one email (0 emails each alert)")
             
             if email:
                 st.session_state.notification_manager.set_email(email)
+            st.session_state.notification_manager.digest_window = digest_window
         
         # Technical indicators
         st.subheader("Technical Indicators")
@@ -217,11 +282,17 @@ def main():
         enable_htf_zones = st.checkbox("Show Higher Timeframe Zones", value=True,
                                       help="Show weekly/monthly zones on lower timeframes")
         
-        # Auto-refresh
+        # Auto-refresh (only the monitoring panel; the background monitor does the polling)
         auto_refresh = st.checkbox("Auto Refresh (30s)", value=False)
         
         # Manual refresh button
         if st.button("🔄 Refresh Data"):
+            # Drop the selected stock's cached frames and memoized zones, and mark its
+            # stored series stale, so the rerun downloads new bars instead of reusing them
+            if symbol != "Choose a stock...":
+                refresh_symbol = format_symbol_for_exchange(symbol, exchange)
+                get_data_manager().invalidate(refresh_symbol)
+                get_zone_detector().clear_cache(refresh_symbol)
             st.session_state.last_update = datetime.now()
             st.rerun()
     
@@ -239,8 +310,8 @@ def main():
                                           index=0, key="individual_breakout_stock")
             if st.button("🔍 Check Breakout", type="primary") and individual_stock != "Choose a stock...":
                 with st.spinner(f"Analyzing {individual_stock}..."):
-                    data_manager = DataManager()
-                    breakout_detector = BreakoutDetector()
+                    data_manager = get_data_manager()
+                    breakout_detector = get_breakout_detector()
                     
                     formatted_symbol = f"{individual_stock}.NS"
                     stock_data = data_manager.get_stock_data(formatted_symbol, period, selected_timeframe)
@@ -311,12 +382,27 @@ def main():
             # Run breakout scan
             if st.session_state.get('run_breakout_scan', False):
                 with st.spinner("Scanning for breakouts..."):
-                    data_manager = DataManager()
-                    breakout_detector = BreakoutDetector()
+                    data_manager = get_data_manager()
+                    breakout_detector = get_breakout_detector()
+                    
+                    # Show progress and partial results while the worker pool runs
+                    scan_progress = st.progress(0.0)
+                    partial_results = st.empty()
+                    found_symbols = []
+                    
+                    def show_scan_progress(scanned_symbol, entry, completed, total):
+                        if entry:
+                            found_symbols.append(scanned_symbol)
+                            partial_results.caption(f"Breakouts found so far: {', '.join(found_symbols)}")
+                        scan_progress.progress(completed / total, text=f"Scanned {completed}/{total} ({scanned_symbol})")
                     
                     breakout_stocks = breakout_detector.scan_index_breakouts(
-                        data_manager, stock_list, selected_timeframe, period
+                        data_manager, stock_list, selected_timeframe, period,
+                        max_workers=8, on_result=show_scan_progress
                     )
+                    
+                    scan_progress.empty()
+                    partial_results.empty()
                 
                 st.session_state['run_breakout_scan'] = False
                 
@@ -425,8 +511,8 @@ def main():
         try:
                 
             # Create data manager and zone detector
-            data_manager = DataManager()
-            zone_detector = ZoneDetector()
+            data_manager = get_data_manager()
+            zone_detector = get_zone_detector()
             
             # Format symbol for NSE stocks
             formatted_symbol = format_symbol_for_exchange(symbol, exchange)
@@ -446,11 +532,11 @@ def main():
                 htf_zones = []
                 enable_htf = enable_htf_zones if not st.session_state.get('detailed_analysis', False) else True
                 if enable_htf and selected_timeframe not in ['1wk', '1mo']:
-                    htf_zones = get_higher_timeframe_zones(data_manager, zone_detector, 
+                    htf_zones = get_higher_timeframe_zones(get_async_data_manager(), zone_detector,
                                                          formatted_symbol, selected_timeframe, period)
                 
                 # Detect zones with enhanced algorithm including HTF confluence
-                zones = zone_detector.detect_zones(stock_data, selected_timeframe, htf_zones)
+                zones = zone_detector.detect_zones(stock_data, selected_timeframe, htf_zones, symbol=formatted_symbol)
                 
                 # Add HTF zones to display list
                 zones.extend(htf_zones)
@@ -605,6 +691,9 @@ def main():
                 # Stock monitoring
                 st.subheader("📋 Stock Monitoring")
                 
+                zone_monitor = get_zone_monitor()
+                session_id = get_session_id()
+                
                 col1, col2 = st.columns([3, 1])
                 with col1:
                     new_stock = st.text_input("Add stock to monitor", placeholder="Enter ticker symbol")
@@ -615,6 +704,17 @@ def main():
                             st.success(f"Added {new_stock.upper()} to monitoring list")
                             st.rerun()
                 
+                # Keep the background monitor watching this session's stocks with this session's
+                # alert settings; other sessions' watches are left alone
+                zone_monitor.subscribe(
+                    session_id,
+                    [format_symbol_for_exchange(stock, exchange) for stock in st.session_state.monitored_stocks],
+                    selected_timeframe, period,
+                    email=email if enable_alerts and email else None,
+                    alert_distance=alert_distance,
+                    digest_window=digest_window
+                )
+                
                 if st.session_state.monitored_stocks:
                     st.write("**Monitored Stocks:**")
                     for i, stock in enumerate(st.session_state.monitored_stocks):
@@ -624,7 +724,13 @@ def main():
                         with col2:
                             if st.button("Remove", key=f"remove_{i}"):
                                 st.session_state.monitored_stocks.remove(stock)
+                                zone_monitor.unwatch(format_symbol_for_exchange(stock, exchange), session_id)
                                 st.rerun()
+                    
+                    # Results refresh on their own every 30s without rerunning the page
+                    st.fragment(show_monitor_results, run_every=30 if auto_refresh else None)(
+                        zone_monitor, session_id
+                    )
                 
             else:
                 st.error("Unable to fetch data for the specified symbol. Please check the ticker symbol and try again.")
@@ -632,11 +738,26 @@ def main():
         except Exception as e:
             st.error(f"An error occurred: {str(e)}")
             st.error("Please check your internet connection and the stock symbol.")
+
+def show_monitor_results(zone_monitor, session_id):
+    """Show the background monitor's latest results and alerts for this session's watches"""
+    status = zone_monitor.get_status(session_id)
+    
+    if status:
+        status_df = pd.DataFrame(status).set_index('symbol')
+        st.dataframe(status_df, use_container_width=True)
+    else:
+        st.caption("Waiting for the first monitor poll...")
+    
+    alerts = zone_monitor.get_alerts(10, session_id)
+    if alerts:
+        st.write("**Monitor Alerts:**")
+        st.dataframe(pd.DataFrame(alerts), use_container_width=True)
     
-    # Auto-refresh functionality
-    if auto_refresh:
-        time.sleep(30)
-        st.rerun()
+    if zone_monitor.last_poll:
+        st.caption(f"Last monitor poll: {zone_monitor.last_poll.strftime('%H:%M:%S')}")
+    if zone_monitor.last_error:
+        st.warning(f"Last monitor poll failed: {zone_monitor.last_error}")
 
 def get_breakout_signal(breakout_type):
     """Get buy/sell signal based on breakout type"""
@@ -712,7 +833,7 @@ def add_technical_indicators(data, show_ema_20=True, show_ema_50=False):
     
     return data
 
-def get_higher_timeframe_zones(data_manager, zone_detector, symbol, current_timeframe, period):
+def get_higher_timeframe_zones(async_data_manager, zone_detector, symbol, current_timeframe, period):
     """Get zones from higher timeframes"""
     htf_zones = []
     
@@ -729,19 +850,28 @@ def get_higher_timeframe_zones(data_manager, zone_detector, symbol, current_time
     if current_timeframe not in htf_mapping:
         return htf_zones
     
+    requests = []
     for htf in htf_mapping[current_timeframe][:2]:  # Get top 2 higher timeframes
+        # Adjust period for higher timeframes
+        htf_period = period
+        if htf in ['1wk', '1mo']:
+            if period in ['1d', '5d']:
+                htf_period = '1y'
+            elif period in ['1mo', '3mo']:
+                htf_period = '2y'
+        requests.append((symbol, htf_period, htf))
+    
+    # Fetch all higher timeframes concurrently; resampled locally from the current series when it covers the period
+    try:
+        htf_frames = async_data_manager.run(async_data_manager.get_many(requests, resample=True))
+    except Exception as e:
+        st.warning(f"Could not fetch higher timeframe data: {str(e)}")
+        return htf_zones
+    
+    for (_, _, htf), htf_data in zip(requests, htf_frames):
         try:
-            # Adjust period for higher timeframes
-            htf_period = period
-            if htf in ['1wk', '1mo']:
-                if period in ['1d', '5d']:
-                    htf_period = '1y'
-                elif period in ['1mo', '3mo']:
-                    htf_period = '2y'
-            
-            htf_data = data_manager.get_stock_data(symbol, htf_period, htf)
             if htf_data is not None and not htf_data.empty:
-                htf_zones_raw = zone_detector.detect_zones(htf_data, htf)
+                htf_zones_raw = zone_detector.detect_zones(htf_data, htf, symbol=symbol)
                 
                 # Mark zones with timeframe info
                 for zone in htf_zones_raw[:3]:  # Only take top 3 zones from each HTF
@@ -890,40 +1020,48 @@ def create_chart(data, zones, symbol, timeframe, show_ema_20=False, show_ema_50=
 
 def check_alerts(symbol, current_price, zones, alert_distance):
     """Check if current price is near any zones and trigger alerts"""
-    for zone in zones:
-        distance_pct = abs(zone['level'] - current_price) / current_price * 100
+    alert_store = get_alert_store()
+    notification_manager = st.session_state.notification_manager
+    zone_index = st.session_state.zone_index
+    # Re-sort only when the zones changed; reruns with the same (memoized) zones reuse the index
+    if st.session_state.indexed_zones.get(symbol) != zones:
+        zone_index.set_zones(symbol, zones)
+        st.session_state.indexed_zones[symbol] = [dict(zone) for zone in zones]
+    
+    for zone, distance_pct in zone_index.query(symbol, current_price, alert_distance):
+        # Skip zones alerted in the last 30 minutes (avoid spam)
+        if not alert_store.try_acquire(symbol, zone['type'], zone['level'], timedelta(minutes=30),
+                                       recipient=notification_manager.email_address):
+            continue
         
-        if distance_pct <= alert_distance:
-            alert_message = f"ALERT: {symbol} is {distance_pct:.2f}% away from {zone['type']} zone at ${zone['level']:.2f}"
-            
-            # Check if this alert was already sent recently (avoid spam)
-            recent_alerts = [a for a in st.session_state.alerts if a.get('symbol') == symbol and a.get('zone_level') == zone['level']]
-            last_alert_time = max([datetime.fromisoformat(a['timestamp']) for a in recent_alerts]) if recent_alerts else datetime.min
-            
-            if datetime.now() - last_alert_time > timedelta(minutes=30):  # 30 minutes cooldown
-                # Add to alerts list
-                alert_data = {
-                    'timestamp': datetime.now().isoformat(),
-                    'symbol': symbol,
-                    'message': alert_message,
-                    'zone_type': zone['type'],
-                    'zone_level': zone['level'],
-                    'current_price': current_price,
-                    'distance_pct': distance_pct
-                }
-                
-                st.session_state.alerts.append(alert_data)
-                
-                # Send email notification
-                try:
-                    st.session_state.notification_manager.send_alert(alert_message, symbol, zone, current_price)
-                    st.success(f"Alert sent: {alert_message}")
-                except Exception as e:
-                    st.warning(f"Failed to send email alert: {str(e)}")
-                
-                # Keep only last 50 alerts to avoid memory issues
-                if len(st.session_state.alerts) > 50:
-                    st.session_state.alerts = st.session_state.alerts[-50:]
+        alert_message = f"ALERT: {symbol} is {distance_pct:.2f}% away from {zone['type']} zone at ${zone['level']:.2f}"
+        
+        # Add to alerts list
+        alert_data = {
+            'timestamp': datetime.now().isoformat(),
+            'symbol': symbol,
+            'message': alert_message,
+            'zone_type': zone['type'],
+            'zone_level': zone['level'],
+            'current_price': current_price,
+            'distance_pct': distance_pct,
+            'recipient': notification_manager.email_address,
+            'email_sent': False
+        }
+        
+        # Send email notification
+        try:
+            alert_data['email_sent'] = notification_manager.send_alert(alert_message, symbol, zone, current_price)
+            st.success(f"Alert sent: {alert_message}")
+        except Exception as e:
+            st.warning(f"Failed to send email alert: {str(e)}")
+        
+        alert_store.record_alert(alert_data)
+        st.session_state.alerts.append(alert_data)
+        
+        # Keep only the last 50 alerts for display; the full history is in the alert store
+        if len(st.session_state.alerts) > 50:
+            st.session_state.alerts = st.session_state.alerts[-50:]
 
 if __name__ == "__main__":
     main()
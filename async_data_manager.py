@@ -0,0 +1,91 @@
+import asyncio
+import pandas as pd
+from typing import Optional, List, Tuple, Dict
+from data_manager import DataManager
+
+class AsyncDataManager:
+    """
+    Asyncio front end for DataManager
+    
+    Downloads run on worker threads (yfinance is blocking) so several fetches overlap
+    instead of serializing. Simultaneous requests for the same (symbol, period, interval)
+    on one event loop are coalesced onto one in-flight download; requests from other
+    loops (e.g. other Streamlit sessions, each in its own asyncio.run) are not joined
+    here, but all downloads go through the wrapped DataManager, whose per-key fetch lock
+    makes them wait for the first one and read its cache.
+    """
+    
+    def __init__(self, data_manager: Optional[DataManager] = None, max_concurrency: int = 8):
+        self.data_manager = data_manager or DataManager()
+        self.max_concurrency = max_concurrency
+        self._in_flight: Dict[Tuple[str, str, str, str], asyncio.Future] = {}
+        self._semaphores: Dict[asyncio.AbstractEventLoop, asyncio.Semaphore] = {}
+    
+    async def get_stock_data(self, symbol: str, period: str, interval: str) -> Optional[pd.DataFrame]:
+        """
+        Fetch stock data without blocking the event loop
+        
+        Args:
+            symbol: Stock ticker symbol (can include .NS for NSE stocks)
+            period: Data period
+            interval: Data interval
+        
+        Returns:
+            DataFrame with OHLCV data or None if error
+        """
+        return await self._coalesced('stock', symbol, period, interval, self.data_manager.get_stock_data)
+    
+    async def get_timeframe_data(self, symbol: str, period: str, interval: str) -> Optional[pd.DataFrame]:
+        """Async DataManager.get_timeframe_data (resampled from a held finer series when possible)"""
+        return await self._coalesced('timeframe', symbol, period, interval, self.data_manager.get_timeframe_data)
+    
+    async def get_many(self, requests: List[Tuple[str, str, str]], resample: bool = False) -> List[Optional[pd.DataFrame]]:
+        """
+        Fetch several (symbol, period, interval) requests concurrently
+        
+        Args:
+            requests: List of (symbol, period, interval) tuples
+            resample: Go through get_timeframe_data instead of get_stock_data
+        
+        Returns:
+            List of DataFrames (or None) in the same order as requests
+        """
+        fetch = self.get_timeframe_data if resample else self.get_stock_data
+        return list(await asyncio.gather(*(fetch(*request) for request in requests)))
+    
+    def run(self, coroutine):
+        """Run a coroutine to completion from synchronous code such as a Streamlit script"""
+        return asyncio.run(coroutine)
+    
+    async def _coalesced(self, kind: str, symbol: str, period: str, interval: str, fetch):
+        """Share one download between concurrent callers on this event loop asking for the same data"""
+        loop = asyncio.get_running_loop()
+        key = (kind, symbol, period, interval)
+        
+        future = self._in_flight.get(key)
+        if future is None or future.get_loop() is not loop:
+            future = loop.create_task(self._run_in_thread(fetch, symbol, period, interval))
+            self._in_flight[key] = future
+            future.add_done_callback(lambda done: self._forget(key, done))
+        
+        # Shield so one cancelled waiter doesn't cancel the download for the others
+        return await asyncio.shield(future)
+    
+    async def _run_in_thread(self, fetch, symbol: str, period: str, interval: str):
+        """Run a blocking DataManager call on a worker thread, bounded by max_concurrency"""
+        async with self._get_semaphore():
+            return await asyncio.to_thread(fetch, symbol, period, interval)
+    
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """Concurrency limit for the running event loop"""
+        loop = asyncio.get_running_loop()
+        if loop not in self._semaphores:
+            # Loops from earlier asyncio.run calls are closed; drop their semaphores
+            self._semaphores = {l: s for l, s in self._semaphores.items() if not l.is_closed()}
+            self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphores[loop]
+    
+    def _forget(self, key: Tuple[str, str, str, str], future: asyncio.Future):
+        """Remove a finished download from the in-flight table"""
+        if self._in_flight.get(key) is future:
+            del self._in_flight[key]
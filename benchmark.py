@@ -0,0 +1,177 @@
+"""
+Benchmarks for the vectorized and incremental code paths
+
+Each section times the optimized path against the one it replaced (still in the tree
+behind a flag, the plain full recompute, or a reference copy kept in this file) on
+deterministic synthetic series from tests/synthetic.py:
+
+    python benchmark.py            # every section
+    python benchmark.py pivots     # selected sections
+"""
+import argparse
+import ast
+import os
+import time
+import tracemalloc
+import warnings
+import numpy as np
+import pandas as pd
+from tests.synthetic import make_ohlcv, make_breakout_frames
+from breakout_detector import BreakoutDetector
+from zone_detector import ZoneDetector, IncrementalZoneDetector
+
+def timed(fn, repeat: int = 3) -> float:
+    """Best wall time of repeat calls, in milliseconds"""
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+def bench_pivots():
+    print("Pivot highs + lows, window 6 (ZoneDetector vectorized_pivots=False vs True)")
+    loop, vectorized = ZoneDetector(vectorized_pivots=False), ZoneDetector()
+    for n in (10_000, 50_000, 100_000):
+        data = make_ohlcv(n, seed=1, freq="min")
+        loop_ms = timed(lambda: (loop._find_pivot_highs(data, 6), loop._find_pivot_lows(data, 6)))
+        vectorized_ms = timed(lambda: (vectorized._find_pivot_highs(data, 6), vectorized._find_pivot_lows(data, 6)))
+        print(f"  {n:>7} bars: loop {loop_ms:9.1f} ms   vectorized {vectorized_ms:7.1f} ms   x{loop_ms / vectorized_ms:.0f}")
+
+def bench_tested_zones():
+    # The loop scanner it replaced is gone; tests/fixtures/zone_regression.json holds its output
+    print("Tested-zone scan (_identify_tested_zones_with_reactions)")
+    detector = ZoneDetector()
+    for label, data in (("5y daily", make_ohlcv(1250, seed=2)),
+                        ("1mo of 1m", make_ohlcv(22 * 375, seed=3, freq="min", volatility=0.003))):
+        print(f"  {label:>10} ({len(data)} bars): {timed(lambda: detector._identify_tested_zones_with_reactions(data)):7.1f} ms")
+
+def bench_incremental_zones():
+    print("Zone refresh per new candle, last 50 candles (full detect_zones vs IncrementalZoneDetector)")
+    full = ZoneDetector()
+    for label, data, timeframe in (("5y daily", make_ohlcv(1250, seed=4), "1d"),
+                                   ("1mo of 1m", make_ohlcv(22 * 375, seed=5, freq="min", volatility=0.003), "1m")):
+        incremental = IncrementalZoneDetector()
+        incremental.update(data.iloc[:-50], timeframe)
+        
+        steps = [data.iloc[:end] for end in range(len(data) - 49, len(data) + 1)]
+        full_ms = timed(lambda: [full._detect_zones(step, timeframe) for step in steps], repeat=1) / len(steps)
+        incremental_ms = timed(lambda: [incremental.update(step, timeframe) for step in steps], repeat=1) / len(steps)
+        print(f"  {label:>10} ({len(data)} bars): full {full_ms:6.2f} ms   incremental {incremental_ms:6.2f} ms per candle")
+
+def nifty_index_lists() -> dict:
+    """The index -> symbols lists of the dashboard's index filter (app.py can't be imported without Streamlit)"""
+    with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")) as f:
+        tree = ast.parse(f.read())
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Assign) and any(getattr(target, 'id', None) == 'index_options' for target in node.targets):
+            return {name: symbols for name, symbols in ast.literal_eval(node.value).items() if symbols}
+    return {}
+
+def bench_tail_only_breakouts():
+    print("Breakout scan per index, 5y of daily bars per symbol (detect_breakouts default vs tail_only=True)")
+    frames = make_breakout_frames(200, seed=8, n_range=(1240, 1250))
+    full, tail = BreakoutDetector(), BreakoutDetector(tail_only=True)
+    full_total = tail_total = 0.0
+    for name, symbols in nifty_index_lists().items():
+        data = [frames[i % len(frames)] for i in range(len(symbols))]
+        full_ms = timed(lambda: [full.detect_breakouts(frame) for frame in data])
+        tail_ms = timed(lambda: [tail.detect_breakouts(frame) for frame in data])
+        full_total += full_ms
+        tail_total += tail_ms
+        print(f"  {name:>13} ({len(symbols):2d} symbols): full {full_ms:6.1f} ms   tail-only {tail_ms:5.1f} ms")
+    print(f"  {'all':>13} {'':12}: full {full_total:6.1f} ms   tail-only {tail_total:5.1f} ms")
+
+def clean_data_reference(data: pd.DataFrame) -> pd.DataFrame:
+    """DataManager._clean_data before it was rewritten to work on the column arrays"""
+    # Remove any rows with missing OHLC data
+    data = data.dropna(subset=['Open', 'High', 'Low', 'Close'])
+    
+    # Ensure High >= Low, Open, Close
+    data['High'] = data[['High', 'Open', 'Close', 'Low']].max(axis=1)
+    data['Low'] = data[['Low', 'Open', 'Close', 'High']].min(axis=1)
+    
+    # Remove any rows where High == Low (invalid data)
+    mask = data['High'] != data['Low']
+    data = data.loc[mask]
+    
+    # Ensure Volume is non-negative
+    data['Volume'] = data['Volume'].abs()
+    
+    # Sort by index (datetime)
+    return data.sort_index()
+
+def make_raw_minute_bars(n: int, seed: int = 0) -> pd.DataFrame:
+    """
+    1m bars shaped like a raw yfinance download
+    
+    Includes the Dividends and Stock Splits columns, 1% rows with a NaN close, 2% flat
+    (High == Low) rows and 1% rows whose High is below the close.
+    """
+    data = make_ohlcv(n, seed=seed, freq="min", volatility=0.001)
+    rng = np.random.default_rng(seed)
+    data['Dividends'] = 0.0
+    data['Stock Splits'] = 0.0
+    
+    rows = rng.permutation(n)
+    nan_rows, flat_rows, broken_rows = rows[:n // 100], rows[n // 100:n * 3 // 100], rows[n * 3 // 100:n // 25]
+    data.iloc[nan_rows, data.columns.get_loc('Close')] = np.nan
+    for column in ('Open', 'High', 'Low', 'Close'):
+        data.iloc[flat_rows, data.columns.get_loc(column)] = data['Open'].to_numpy()[flat_rows]
+    data.iloc[broken_rows, data.columns.get_loc('High')] = data['Close'].to_numpy()[broken_rows] * 0.999
+    return data
+
+def peak_memory(fn) -> float:
+    """Peak memory traced by tracemalloc during one call, in MiB"""
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1] / 2 ** 20
+    finally:
+        tracemalloc.stop()
+
+def bench_clean_data():
+    # Imported here: DataManager needs yfinance and Streamlit, the other sections don't
+    from data_cache import SharedDataCache
+    from data_manager import DataManager
+    
+    print("OHLCV cleaning of 1m bars (previous _clean_data vs DataManager._clean_data)")
+    data_manager = DataManager(use_store=False, cache=SharedDataCache())
+    # 1m 'max' is the last ~7 sessions (about 2,800 bars); the large frame shows the scaling
+    for n in (2_800, 1_000_000):
+        data = make_raw_minute_bars(n, seed=6)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")  # The old version assigns into a filtered frame
+            expected = clean_data_reference(data)
+            assert data_manager._clean_data(data).equals(expected)
+            
+            reference_ms = timed(lambda: clean_data_reference(data))
+            reference_mib = peak_memory(lambda: clean_data_reference(data))
+        current_ms = timed(lambda: data_manager._clean_data(data))
+        current_mib = peak_memory(lambda: data_manager._clean_data(data))
+        print(f"  {n:>9} bars: previous {reference_ms:7.2f} ms, peak {reference_mib:6.1f} MiB   "
+              f"current {current_ms:7.2f} ms, peak {current_mib:6.1f} MiB")
+
+SECTIONS = {
+    'pivots': bench_pivots,
+    'tested_zones': bench_tested_zones,
+    'incremental_zones': bench_incremental_zones,
+    'tail_only_breakouts': bench_tail_only_breakouts,
+    'clean_data': bench_clean_data
+}
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the optimized zone and breakout paths")
+    parser.add_argument("sections", nargs="*", help=f"Sections to run: {', '.join(SECTIONS)} (default: all)")
+    args = parser.parse_args()
+    
+    unknown = [section for section in args.sections if section not in SECTIONS]
+    if unknown:
+        parser.error(f"unknown section(s): {', '.join(unknown)}")
+    
+    for section in args.sections or SECTIONS:
+        SECTIONS[section]()
+        print()
+
+if __name__ == "__main__":
+    main()
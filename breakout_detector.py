@@ -1,12 +1,22 @@
 import pandas as pd
 import numpy as np
+import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 
 class BreakoutDetector:
-    def __init__(self):
+    TAIL_BARS = 50  # Longest indicator window (SMA_50); older bars only matter for the ATH
+    ATH_CACHE_SIZE = 2048
+    
+    def __init__(self, tail_only=False):
         self.min_volume_increase = 1.5  # Minimum volume increase for breakout confirmation
         self.min_price_move = 2.0  # Minimum price move percentage for breakout
         self.lookback_period = 20  # Period to look back for resistance/support levels
         self.ath_threshold = 0.95  # Within 5% of ATH to be considered near ATH
+        self.tail_only = tail_only  # Compute indicators from the last TAIL_BARS bars only
+        self._ath_cache = OrderedDict()  # Running max of the bars before the tail, per series
+        self._ath_lock = threading.Lock()
         
     def detect_breakouts(self, data, timeframe='1d'):
         """
@@ -15,9 +25,17 @@ class BreakoutDetector:
         """
         if data is None or len(data) < self.lookback_period:
             return None
+        
+        if self.tail_only:
+            return self.evaluate_snapshot(self._tail_snapshot(data), timeframe)
             
         data = data.copy()
         
+        # Compact (float32) frames from DataManager: compute in full precision
+        float32_columns = [col for col in data.columns if data[col].dtype == np.float32]
+        if float32_columns:
+            data = data.astype({col: np.float64 for col in float32_columns})
+        
         # Calculate technical indicators
         data['SMA_20'] = data['Close'].rolling(window=20).mean()
         data['SMA_50'] = data['Close'].rolling(window=50).mean()
@@ -25,38 +43,142 @@ class BreakoutDetector:
         data['High_20'] = data['High'].rolling(window=20).max()
         data['Low_20'] = data['Low'].rolling(window=20).min()
         
-        # Get current values
+        return self.evaluate_snapshot(self._indicator_snapshot(data), timeframe)
+    
+    def _indicator_snapshot(self, data):
+        """
+        Collect the handful of latest values the breakout rules read
+        
+        The rules only look at the last two bars of each indicator, the all-time high
+        and the last 10 highs, so any source that can produce these values (full
+        rolling frames, a streaming engine) can share evaluate_snapshot.
+        """
         current_close = data['Close'].iloc[-1]
-        current_volume = data['Volume'].iloc[-1]
-        prev_close = data['Close'].iloc[-2] if len(data) > 1 else current_close
-        avg_volume = data['Volume_SMA'].iloc[-1]
+        
+        return {
+            'bars': len(data),
+            'close': current_close,
+            'high': data['High'].iloc[-1],
+            'volume': data['Volume'].iloc[-1],
+            'prev_close': data['Close'].iloc[-2] if len(data) > 1 else current_close,
+            'avg_volume': data['Volume_SMA'].iloc[-1],
+            'resistance': data['High_20'].iloc[-2],  # Previous 20-day high
+            'support': data['Low_20'].iloc[-2],  # Previous 20-day low
+            'sma_20': data['SMA_20'].iloc[-1],
+            'sma_50': data['SMA_50'].iloc[-1],
+            'prev_sma_20': data['SMA_20'].iloc[-2],
+            'ath': data['High'].max(),
+            'recent_highs': data['High'].tail(10).to_numpy()
+        }
+    
+    def _tail_snapshot(self, data):
+        """
+        Build the indicator snapshot from the last TAIL_BARS bars, without copying the frame
+        
+        Indicator windows are averaged/reduced directly, so values can differ from the
+        rolling columns in the last bits of precision; the ATH combines a cached running
+        max of the older bars with the tail.
+        """
+        n = len(data)
+        tail = data.iloc[-self.TAIL_BARS:]
+        closes = tail['Close'].to_numpy(dtype=float)
+        highs = tail['High'].to_numpy(dtype=float)
+        lows = tail['Low'].to_numpy(dtype=float)
+        volumes = tail['Volume'].to_numpy(dtype=float)
+        
+        return {
+            'bars': n,
+            'close': closes[-1],
+            'high': highs[-1],
+            'volume': volumes[-1],
+            'prev_close': closes[-2] if n > 1 else closes[-1],
+            'avg_volume': volumes[-20:].mean(),
+            'resistance': highs[-21:-1].max() if n > 20 else np.nan,  # Previous 20-day high
+            'support': lows[-21:-1].min() if n > 20 else np.nan,  # Previous 20-day low
+            'sma_20': closes[-20:].mean(),
+            'sma_50': closes[-50:].mean() if n >= 50 else np.nan,
+            'prev_sma_20': closes[-21:-1].mean() if n > 20 else np.nan,
+            'ath': np.fmax(self._head_max(data), np.fmax.reduce(highs)),
+            'recent_highs': highs[-10:]
+        }
+    
+    def _head_max(self, data):
+        """
+        Highest high of the bars before the tail, from a cached running max
+        
+        Entries are keyed by the series' first bar and extended as bars are appended. The
+        high of the last cached bar is rechecked so adjusted (rescaled) history or a
+        different series starting on the same bar is recomputed instead of reused; an
+        edit to a single older bar is not detected.
+        """
+        head_len = len(data) - self.TAIL_BARS
+        if head_len <= 0:
+            return np.nan
+        
+        index = data.index
+        highs = data['High'].to_numpy()
+        key = (index[0], float(highs[0]))
+        
+        with self._ath_lock:
+            entry = self._ath_cache.get(key)
+            if entry is not None:
+                self._ath_cache.move_to_end(key)
+        
+        if (entry is not None and entry['length'] <= head_len and index[entry['length'] - 1] == entry['last_timestamp']
+                and float(highs[entry['length'] - 1]) == entry['last_high']):
+            head_max = np.fmax(entry['max'], float(np.fmax.reduce(highs[entry['length']:head_len], initial=-np.inf)))
+        else:
+            head_max = float(np.fmax.reduce(highs[:head_len]))
+        
+        with self._ath_lock:
+            self._ath_cache[key] = {
+                'length': head_len,
+                'last_timestamp': index[head_len - 1],
+                'last_high': float(highs[head_len - 1]),
+                'max': head_max
+            }
+            while len(self._ath_cache) > self.ATH_CACHE_SIZE:
+                self._ath_cache.popitem(last=False)
+        
+        return head_max
+    
+    def evaluate_snapshot(self, snapshot, timeframe='1d'):
+        """
+        Detect a breakout from an indicator snapshot (see _indicator_snapshot)
+        Returns breakout information with type, strength, and confirmation
+        """
+        # Get current values
+        current_close = snapshot['close']
+        current_volume = snapshot['volume']
+        prev_close = snapshot['prev_close']
+        avg_volume = snapshot['avg_volume']
         
         # Calculate price change
         price_change = ((current_close - prev_close) / prev_close) * 100
         volume_ratio = current_volume / avg_volume if avg_volume > 0 else 1
         
         # Detect breakout type
-        breakout_info = self._analyze_breakout_pattern(data)
+        breakout_info = self._analyze_breakout_pattern(snapshot)
         
         if breakout_info:
             breakout_info.update({
                 'current_price': current_close,
                 'price_change_pct': price_change,
                 'volume_ratio': volume_ratio,
-                'confirmation_strength': self._calculate_confirmation_strength(data, breakout_info),
+                'confirmation_strength': self._calculate_confirmation_strength(snapshot, breakout_info),
                 'timeframe': timeframe
             })
             
         return breakout_info
     
-    def _analyze_breakout_pattern(self, data):
+    def _analyze_breakout_pattern(self, snapshot):
         """Analyze different types of breakout patterns"""
-        current_close = data['Close'].iloc[-1]
-        current_high = data['High'].iloc[-1]
-        current_volume = data['Volume'].iloc[-1]
+        current_close = snapshot['close']
+        current_high = snapshot['high']
+        current_volume = snapshot['volume']
         
         # Resistance breakout - price breaking above recent highs
-        resistance_level = data['High_20'].iloc[-2]  # Previous 20-day high
+        resistance_level = snapshot['resistance']  # Previous 20-day high
         if current_high > resistance_level:
             price_move = ((current_close - resistance_level) / resistance_level) * 100
             if price_move >= self.min_price_move:
@@ -69,7 +191,7 @@ class BreakoutDetector:
                 }
         
         # Support breakdown - price breaking below recent lows
-        support_level = data['Low_20'].iloc[-2]  # Previous 20-day low
+        support_level = snapshot['support']  # Previous 20-day low
         if current_close < support_level:
             price_move = ((support_level - current_close) / support_level) * 100
             if price_move >= self.min_price_move:
@@ -82,14 +204,14 @@ class BreakoutDetector:
                 }
         
         # Moving average breakout
-        if len(data) >= 50:
-            sma_20 = data['SMA_20'].iloc[-1]
-            sma_50 = data['SMA_50'].iloc[-1]
+        if snapshot['bars'] >= 50:
+            sma_20 = snapshot['sma_20']
+            sma_50 = snapshot['sma_50']
             
             # Bullish MA breakout
             if current_close > sma_20 and sma_20 > sma_50:
-                prev_close = data['Close'].iloc[-2]
-                prev_sma_20 = data['SMA_20'].iloc[-2]
+                prev_close = snapshot['prev_close']
+                prev_sma_20 = snapshot['prev_sma_20']
                 
                 # Check if this is a fresh breakout above 20 SMA
                 if prev_close <= prev_sma_20 and current_close > sma_20:
@@ -104,13 +226,13 @@ class BreakoutDetector:
                         }
         
         # Volume breakout - unusual volume with price movement
-        avg_volume = data['Volume_SMA'].iloc[-1]
+        avg_volume = snapshot['avg_volume']
         if current_volume > (avg_volume * self.min_volume_increase):
-            price_change = ((current_close - data['Close'].iloc[-2]) / data['Close'].iloc[-2]) * 100
+            price_change = ((current_close - snapshot['prev_close']) / snapshot['prev_close']) * 100
             if abs(price_change) >= 3.0:  # Significant price move with volume
                 return {
                     'type': 'volume_breakout',
-                    'level': data['Close'].iloc[-2],
+                    'level': snapshot['prev_close'],
                     'current_price': current_close,
                     'breakout_strength': abs(price_change),
                     'pattern': 'Volume Breakout',
@@ -118,12 +240,12 @@ class BreakoutDetector:
                 }
         
         # ATH breakout - near all-time high with volume
-        ath_level = data['High'].max()
+        ath_level = snapshot['ath']
         ath_distance = ((ath_level - current_close) / ath_level) * 100
         
         if ath_distance <= (100 - self.ath_threshold * 100):  # Within 5% of ATH
             # Check for multiple attempts near ATH in recent days
-            recent_highs = data['High'].tail(10)
+            recent_highs = snapshot['recent_highs']
             attempts_near_ath = sum(1 for high in recent_highs if ((ath_level - high) / ath_level) * 100 <= 2.0)
             
             if attempts_near_ath >= 2 and current_volume > (avg_volume * 1.3):  # Multiple attempts + volume
@@ -141,14 +263,14 @@ class BreakoutDetector:
         
         return None
     
-    def _calculate_confirmation_strength(self, data, breakout_info):
+    def _calculate_confirmation_strength(self, snapshot, breakout_info):
         """Calculate how strong the breakout confirmation is"""
         if not breakout_info:
             return 0
             
         score = 0
-        current_volume = data['Volume'].iloc[-1]
-        avg_volume = data['Volume_SMA'].iloc[-1]
+        current_volume = snapshot['volume']
+        avg_volume = snapshot['avg_volume']
         
         # Volume confirmation (0-40 points)
         volume_ratio = current_volume / avg_volume if avg_volume > 0 else 1
@@ -183,41 +305,265 @@ class BreakoutDetector:
         
         return min(score, 100)  # Cap at 100
     
-    def scan_index_breakouts(self, data_manager, index_stocks, timeframe='1d', period='3mo'):
+    def scan_index_breakouts(self, data_manager, index_stocks, timeframe='1d', period='3mo',
+                             max_workers=None, symbol_timeout=30.0, on_result=None, panel=False):
         """
         Scan all stocks in an index for breakout patterns
         Returns list of stocks with breakout information
+        
+        With panel set, the whole index is downloaded in batched requests and evaluated
+        in one vectorized pass over a symbols x bars panel (see scan_panel_breakouts).
+        Otherwise the whole index is first downloaded in batched requests. With
+        max_workers set, the symbols are then analysed (and any the bulk download missed
+        fetched) concurrently on a thread pool (see iter_index_breakouts), and
+        on_result(symbol, entry, completed, total) is called as each one finishes, so
+        callers can render partial results; without it they are analysed serially.
         """
         breakout_stocks = []
         
-        for symbol in index_stocks:
-            try:
-                # Format symbol for NSE
-                formatted_symbol = f"{symbol}.NS"
-                
-                # Get stock data
-                stock_data = data_manager.get_stock_data(formatted_symbol, period, timeframe)
-                
-                if stock_data is not None and not stock_data.empty:
-                    # Detect breakouts
-                    breakout_info = self.detect_breakouts(stock_data, timeframe)
-                    
-                    if breakout_info and breakout_info.get('confirmation_strength', 0) >= 30:
-                        breakout_stocks.append({
-                            'symbol': symbol,
-                            'formatted_symbol': formatted_symbol,
-                            'breakout_info': breakout_info
-                        })
-                        
-            except Exception as e:
-                # Skip stocks that can't be processed
-                continue
+        if panel:
+            stocks_data = self._prefetch_index(data_manager, index_stocks, timeframe, period)
+            
+            # Symbols the bulk download didn't return are fetched one by one
+            panel_data = {}
+            for symbol in index_stocks:
+                stock_data = stocks_data.get(f"{symbol}.NS")
+                if stock_data is None:
+                    try:
+                        stock_data = data_manager.get_stock_data(f"{symbol}.NS", period, timeframe)
+                    except Exception:
+                        stock_data = None  # Skip stocks that can't be fetched
+                panel_data[symbol] = stock_data
+            
+            breakout_stocks = self.scan_panel_breakouts(panel_data, timeframe)
+        elif max_workers:
+            # Batched download first; the pool only fetches what it left out
+            stocks_data = self._prefetch_index(data_manager, index_stocks, timeframe, period)
+            
+            for completed, (symbol, entry) in enumerate(
+                    self.iter_index_breakouts(data_manager, index_stocks, timeframe, period,
+                                              max_workers, symbol_timeout, stocks_data), start=1):
+                if entry:
+                    breakout_stocks.append(entry)
+                if on_result:
+                    on_result(symbol, entry, completed, len(index_stocks))
+            
+            # Restore index order first so ties sort exactly like the serial scan
+            positions = {symbol: i for i, symbol in enumerate(index_stocks)}
+            breakout_stocks.sort(key=lambda x: positions[x['symbol']])
+        else:
+            # Download the whole index in batched multi-ticker requests up front;
+            # _scan_symbol fetches anything missing itself
+            stocks_data = self._prefetch_index(data_manager, index_stocks, timeframe, period)
+            
+            for symbol in index_stocks:
+                entry = self._scan_symbol(data_manager, symbol, timeframe, period,
+                                          stocks_data.get(f"{symbol}.NS"))
+                if entry:
+                    breakout_stocks.append(entry)
         
         # Sort by confirmation strength
         breakout_stocks.sort(key=lambda x: x['breakout_info']['confirmation_strength'], reverse=True)
         
         return breakout_stocks
     
+    def scan_panel_breakouts(self, stocks_data, timeframe='1d', min_confirmation=30):
+        """
+        Evaluate every breakout pattern for many stocks in one vectorized pass
+        
+        Each stock's last TAIL_BARS bars are right-aligned into symbols x bars arrays
+        (shorter histories are NaN-padded on the left), so every rule becomes a column
+        operation over all symbols. Indicators are computed like the tail-only mode.
+        
+        Args:
+            stocks_data: Dictionary mapping symbol -> OHLCV DataFrame (or None), in index order
+            timeframe: Timeframe string stored in the breakout information
+            min_confirmation: Minimum confirmation strength to report
+        
+        Returns:
+            List of scan entries for stocks with breakouts, in index order
+        """
+        symbols = [symbol for symbol, data in stocks_data.items()
+                   if data is not None and len(data) >= self.lookback_period]
+        if not symbols:
+            return []
+        
+        width = self.TAIL_BARS
+        closes, highs, lows, volumes = (np.full((len(symbols), width), np.nan) for _ in range(4))
+        bars = np.empty(len(symbols), dtype=int)
+        head_max = np.empty(len(symbols))
+        
+        for row, symbol in enumerate(symbols):
+            data = stocks_data[symbol]
+            columns = [data.columns.get_loc(col) for col in ('Close', 'High', 'Low', 'Volume')]
+            tail = data.iloc[-width:].to_numpy(dtype=float)[:, columns]
+            k = len(tail)
+            closes[row, -k:], highs[row, -k:], lows[row, -k:], volumes[row, -k:] = tail.T
+            bars[row] = len(data)
+            head_max[row] = self._head_max(data)
+        
+        # Indicator snapshot columns, as in _tail_snapshot
+        close, high, volume, prev_close = closes[:, -1], highs[:, -1], volumes[:, -1], closes[:, -2]
+        avg_volume = volumes[:, -20:].mean(axis=1)
+        has_previous_window = bars > 20
+        resistance = np.where(has_previous_window, highs[:, -21:-1].max(axis=1), np.nan)
+        support = np.where(has_previous_window, lows[:, -21:-1].min(axis=1), np.nan)
+        sma_20 = closes[:, -20:].mean(axis=1)
+        sma_50 = np.where(bars >= 50, closes.mean(axis=1), np.nan)
+        prev_sma_20 = np.where(has_previous_window, closes[:, -21:-1].mean(axis=1), np.nan)
+        ath = np.fmax(head_max, np.fmax.reduce(highs, axis=1))
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            price_change = ((close - prev_close) / prev_close) * 100
+            volume_ratio = np.where(avg_volume > 0, volume / avg_volume, 1)
+            
+            # Pattern rules, in the priority order of _analyze_breakout_pattern
+            resistance_move = ((close - resistance) / resistance) * 100
+            support_move = ((support - close) / support) * 100
+            ma_move = ((close - sma_20) / sma_20) * 100
+            ath_distance = ((ath - close) / ath) * 100
+            attempts = (((ath[:, None] - highs[:, -10:]) / ath[:, None]) * 100 <= 2.0).sum(axis=1)
+            ath_move = ((close - ath * 0.95) / (ath * 0.95)) * 100
+        
+        is_resistance = (high > resistance) & (resistance_move >= self.min_price_move)
+        is_support = (close < support) & (support_move >= self.min_price_move)
+        is_ma = ((bars >= 50) & (close > sma_20) & (sma_20 > sma_50) & (prev_close <= prev_sma_20) &
+                 (ma_move >= 1.0))
+        is_volume = (volume > avg_volume * self.min_volume_increase) & (np.abs(price_change) >= 3.0)
+        is_ath = ((ath_distance <= (100 - self.ath_threshold * 100)) & (attempts >= 2) &
+                  (volume > avg_volume * 1.3) & (close > ath * 0.98))
+        
+        conditions = [is_resistance, is_support, is_ma, is_volume, is_ath]
+        types = ['resistance_breakout', 'support_breakdown', 'ma_breakout_bullish', 'volume_breakout', 'ath_breakout']
+        names = ['Resistance Breakout', 'Support Breakdown', 'Moving Average Breakout', 'Volume Breakout',
+                 'ATH Breakout Attempt']
+        pattern_scores = [25, 20, 15, 10, 30]
+        
+        pattern = np.select(conditions, list(range(len(types))), default=-1)
+        level = np.select(conditions, [resistance, support, sma_20, prev_close, ath])
+        strength = np.select(conditions, [resistance_move, support_move, ma_move, np.abs(price_change),
+                                          np.where(ath_move < 2.0, 2.0, ath_move)])
+        
+        # Confirmation strength, as in _calculate_confirmation_strength
+        confirmation = (np.select([volume_ratio >= 2.0, volume_ratio >= 1.5, volume_ratio >= 1.2], [40, 25, 15]) +
+                        np.select([strength >= 5.0, strength >= 3.0, strength >= 2.0], [30, 20, 10]) +
+                        np.select([pattern == i for i in range(len(types))], pattern_scores))
+        confirmation = np.minimum(confirmation, 100)
+        
+        breakout_stocks = []
+        for row in np.flatnonzero((pattern >= 0) & (confirmation >= min_confirmation)):
+            breakout_type = types[pattern[row]]
+            breakout_info = {
+                'type': breakout_type,
+                'level': level[row],
+                'current_price': close[row],
+                'breakout_strength': strength[row],
+                'pattern': names[pattern[row]]
+            }
+            if breakout_type == 'volume_breakout':
+                breakout_info['volume_increase'] = volume[row] / avg_volume[row]
+            elif breakout_type == 'ath_breakout':
+                breakout_info['ath_distance'] = ath_distance[row]
+                breakout_info['attempts'] = int(attempts[row])
+            
+            breakout_info.update({
+                'current_price': close[row],
+                'price_change_pct': price_change[row],
+                'volume_ratio': volume_ratio[row],
+                'confirmation_strength': int(confirmation[row]),
+                'timeframe': timeframe
+            })
+            breakout_stocks.append({
+                'symbol': symbols[row],
+                'formatted_symbol': f"{symbols[row]}.NS",
+                'breakout_info': breakout_info
+            })
+        
+        return breakout_stocks
+    
+    def iter_index_breakouts(self, data_manager, index_stocks, timeframe='1d', period='3mo',
+                             max_workers=8, symbol_timeout=30.0, stocks_data=None):
+        """
+        Fetch and analyse index stocks concurrently, yielding results as they complete
+        
+        Yields (symbol, entry) tuples in completion order, where entry is the breakout
+        dictionary or None if the stock has no breakout, failed, or took longer than
+        symbol_timeout seconds. Timed-out workers can't be interrupted; their results
+        are simply discarded. stocks_data optionally holds already downloaded frames
+        keyed by NSE symbol (see _prefetch_index); only the others are fetched.
+        """
+        stocks_data = stocks_data or {}
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        started = {}
+        
+        def scan(symbol):
+            started[symbol] = time.monotonic()
+            return self._scan_symbol(data_manager, symbol, timeframe, period, stocks_data.get(f"{symbol}.NS"))
+        
+        futures = {executor.submit(scan, symbol): symbol for symbol in index_stocks}
+        pending = set(futures)
+        
+        try:
+            while pending:
+                done, pending = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+                
+                for future in done:
+                    try:
+                        yield futures[future], future.result()
+                    except Exception:
+                        yield futures[future], None
+                
+                # Give up on symbols that have been running too long
+                now = time.monotonic()
+                for future in list(pending):
+                    symbol = futures[future]
+                    if symbol in started and now - started[symbol] > symbol_timeout:
+                        pending.discard(future)
+                        yield symbol, None
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    def _prefetch_index(self, data_manager, index_stocks, timeframe, period):
+        """
+        Bulk-download an index's stocks, keyed by NSE symbol
+        
+        A failed bulk download returns what it can (possibly nothing) instead of raising,
+        so the scan falls back to fetching each symbol on its own.
+        """
+        try:
+            return data_manager.get_multiple_stocks_data(
+                [f"{symbol}.NS" for symbol in index_stocks], period, timeframe
+            )
+        except Exception:
+            return {}
+    
+    def _scan_symbol(self, data_manager, symbol, timeframe, period, stock_data=None):
+        """Fetch (unless given) and analyse one index stock; returns its scan entry or None"""
+        try:
+            # Format symbol for NSE
+            formatted_symbol = f"{symbol}.NS"
+            
+            # Get stock data
+            if stock_data is None:
+                stock_data = data_manager.get_stock_data(formatted_symbol, period, timeframe)
+            
+            if stock_data is not None and not stock_data.empty:
+                # Detect breakouts
+                breakout_info = self.detect_breakouts(stock_data, timeframe)
+                
+                if breakout_info and breakout_info.get('confirmation_strength', 0) >= 30:
+                    return {
+                        'symbol': symbol,
+                        'formatted_symbol': formatted_symbol,
+                        'breakout_info': breakout_info
+                    }
+                    
+        except Exception as e:
+            # Skip stocks that can't be processed
+            pass
+        
+        return None
+    
     def get_breakout_summary(self, breakout_info):
         """Get a human-readable summary of the breakout"""
         if not breakout_info:
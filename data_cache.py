@@ -0,0 +1,192 @@
+import os
+import threading
+import pandas as pd
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional, Dict
+
+# Seconds a cached frame stays valid, by interval: fast bars go stale quickly, monthly bars barely change
+INTERVAL_TTLS = {
+    "1m": 60, "2m": 60, "5m": 120, "15m": 300, "30m": 300,
+    "60m": 600, "90m": 600, "1h": 600, "4h": 900,
+    "1d": 1800, "5d": 3600, "1wk": 6 * 3600, "1mo": 12 * 3600, "3mo": 12 * 3600
+}
+
+DEFAULT_MEMORY_BUDGET = int(os.getenv("DATA_CACHE_MAX_MB", "512")) * 1024 * 1024
+
+class SharedDataCache:
+    """
+    Thread-safe in-memory cache of cleaned OHLCV frames shared by the whole process
+    
+    Entries expire after a per-interval TTL and the least recently used entries are
+    evicted once the cached frames exceed the memory budget. One instance (see
+    get_shared_cache) serves every DataManager, Streamlit session and rerun.
+    """
+    
+    def __init__(self, memory_budget: int = DEFAULT_MEMORY_BUDGET, ttls: Optional[Dict[str, int]] = None,
+                 default_ttl: int = 300):
+        self.memory_budget = memory_budget
+        self.ttls = dict(INTERVAL_TTLS, **(ttls or {}))
+        self.default_ttl = default_ttl
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0  # Removed by LRU to stay under the memory budget
+        self.expirations = 0  # Removed because their TTL ran out
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+    
+    def get(self, key: str, record: bool = True) -> Optional[pd.DataFrame]:
+        """
+        Get a cached frame
+        
+        Args:
+            key: Cache key
+            record: Count the lookup in hits/misses; off for probes (e.g. trying each
+                period in turn) that are not a request of their own
+        
+        Returns:
+            The cached DataFrame, or None if missing or expired
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += record
+                return None
+            
+            if self._is_expired(entry, datetime.now()):
+                self._remove(key)
+                self.expirations += 1
+                self.misses += record
+                return None
+            
+            self._entries.move_to_end(key)
+            self.hits += record
+            return entry['data']
+    
+    def put(self, key: str, data: pd.DataFrame, interval: str):
+        """
+        Cache a frame, evicting least recently used entries if over the memory budget
+        
+        Args:
+            key: Cache key
+            data: DataFrame to cache
+            interval: Data interval, selects the TTL
+        """
+        size = self._frame_size(data)
+        
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            
+            self._entries[key] = {
+                'data': data,
+                'timestamp': datetime.now(),
+                'interval': interval,
+                'size': size
+            }
+            self.total_bytes += size
+            
+            if self.total_bytes > self.memory_budget:
+                # Dropping dead entries first may be enough to get under budget
+                self.purge_expired()
+                self._evict_to_budget()
+    
+    def purge_expired(self) -> int:
+        """
+        Remove all expired entries
+        
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            now = datetime.now()
+            expired = [key for key, entry in self._entries.items() if self._is_expired(entry, now)]
+            for key in expired:
+                self._remove(key)
+            self.expirations += len(expired)
+            return len(expired)
+    
+    def invalidate(self, prefix: str) -> int:
+        """
+        Remove every entry whose key starts with prefix
+        
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            keys = [key for key in self._entries if key.startswith(prefix)]
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+    
+    def set_memory_budget(self, memory_budget: int):
+        """Change the memory ceiling in bytes, evicting immediately if now over it"""
+        with self._lock:
+            self.memory_budget = memory_budget
+            self._evict_to_budget()
+    
+    def get_stats(self) -> dict:
+        """
+        Get cache statistics
+        
+        Returns:
+            Dictionary with entries, bytes, memory budget, hits, misses, hit rate,
+            evictions and expirations
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self.total_bytes,
+                'memory_budget': self.memory_budget,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations
+            }
+    
+    def get_ttl(self, interval: str) -> int:
+        """TTL in seconds for an interval"""
+        return self.ttls.get(interval, self.default_ttl)
+    
+    def _evict_to_budget(self):
+        """Evict least recently used entries until under the memory budget"""
+        # Never evict the most recent entry, even if it alone exceeds the budget
+        while self.total_bytes > self.memory_budget and len(self._entries) > 1:
+            _, evicted = self._entries.popitem(last=False)
+            self.total_bytes -= evicted['size']
+            self.evictions += 1
+    
+    def _remove(self, key: str):
+        """Remove one entry and release its bytes"""
+        self.total_bytes -= self._entries.pop(key)['size']
+    
+    def _is_expired(self, entry: dict, now: datetime) -> bool:
+        return (now - entry['timestamp']).total_seconds() >= self.get_ttl(entry['interval'])
+    
+    def clear(self):
+        """Remove all entries"""
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def _frame_size(self, data: pd.DataFrame) -> int:
+        """Memory used by a frame in bytes, including its index"""
+        return int(data.memory_usage(index=True, deep=True).sum())
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+def get_shared_cache() -> SharedDataCache:
+    """Get the process-wide cache, creating it on first use"""
+    global _shared_cache
+    
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = SharedDataCache()
+        return _shared_cache
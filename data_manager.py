@@ -1,18 +1,86 @@
+import os
+import time
+import threading
 import yfinance as yf
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import streamlit as st
-from typing import Optional
+from typing import Optional, Dict, List
+from ohlcv_store import OHLCVStore
+from data_cache import SharedDataCache, get_shared_cache
+
+# Periods in increasing length, used to decide whether a stored series covers a request
+PERIOD_ORDER = ["1d", "5d", "1mo", "3mo", "6mo", "1y", "2y", "5y", "10y", "max"]
+
+# Intervals Yahoo Finance serves natively; anything else is built by resampling
+YAHOO_INTERVALS = {"1m", "2m", "5m", "15m", "30m", "60m", "90m", "1h", "1d", "5d", "1wk", "1mo", "3mo"}
+
+# Pandas resample rule per interval and the finer intervals whose bars nest inside it (coarsest first)
+RESAMPLE_RULES = {"5m": "5min", "15m": "15min", "1h": "1h", "4h": "4h", "1d": "1D", "1wk": "W-MON", "1mo": "MS"}
+RESAMPLE_BASES = {
+    "5m": ["1m"],
+    "15m": ["5m", "1m"],
+    "1h": ["15m", "5m", "1m"],
+    "4h": ["1h", "15m", "5m", "1m"],
+    "1d": ["4h", "1h", "15m", "5m", "1m"],
+    "1wk": ["1d", "4h", "1h", "15m", "5m", "1m"],
+    "1mo": ["1d", "4h", "1h", "15m", "5m", "1m"]
+}
+
+# Exchange session open times (local exchange time) used to align intraday bars
+SESSION_OPENS = {".NS": "09:15", ".BO": "09:15"}
+
+# How far back Yahoo serves intraday bars; a tail request reaching further fails
+INTRADAY_TAIL_LIMITS = {
+    "1m": pd.Timedelta(days=7),
+    "2m": pd.Timedelta(days=59), "5m": pd.Timedelta(days=59), "15m": pd.Timedelta(days=59),
+    "30m": pd.Timedelta(days=59), "90m": pd.Timedelta(days=59),
+    "60m": pd.Timedelta(days=729), "1h": pd.Timedelta(days=729)
+}
+
+# Exchange timezones by ticker suffix; other symbols ask Yahoo once
+EXCHANGE_TIMEZONES = {".NS": "Asia/Kolkata", ".BO": "Asia/Kolkata"}
 
 class DataManager:
     """
     Manages stock data retrieval and processing
     """
     
-    def __init__(self):
-        self.cache_duration = 300  # 5 minutes cache
-        self.data_cache = {}
+    def __init__(self, store: Optional[OHLCVStore] = None, use_store: bool = True, session=None,
+                 cache: Optional[SharedDataCache] = None, cache_memory_limit: Optional[int] = None,
+                 compact: bool = False):
+        self.cache_duration = 300  # 5 minutes cache for intervals without their own TTL
+        self.session = session  # HTTP session passed to yfinance; None uses yfinance's shared pooled session
+        self.compact = compact  # Slim float32 OHLCV frames instead of yfinance's full float64 frames
+        
+        # Process-wide cache shared by every DataManager, session and rerun. A memory limit
+        # applies to the caller's own cache, or to a private one: it must not change the
+        # ceiling of the shared cache under every other manager
+        if cache is None:
+            cache = get_shared_cache() if cache_memory_limit is None else SharedDataCache(cache_memory_limit)
+        elif cache_memory_limit is not None:
+            cache.set_memory_budget(cache_memory_limit)
+        self.data_cache = cache
+        self.cache_stats = {'memory_hits': 0, 'store_hits': 0, 'tail_fetches': 0, 'misses': 0}
+        self.bulk_batch_size = 20  # Symbols per multi-ticker Yahoo request
+        self.quote_ttl = 5  # Seconds a batched last price is reused
+        self._quotes = {}  # symbol -> (last price, time.monotonic() when fetched)
+        self._quotes_lock = threading.Lock()
+        self._exchange_tz = {}  # symbol -> exchange timezone name
+        self._fetch_locks = {}  # cache key -> lock held while that series is fetched (one small lock per key)
+        self._fetch_locks_lock = threading.Lock()
+        
+        # Persistent on-disk store shared across sessions and restarts
+        self.store = store
+        if self.store is None and use_store:
+            try:
+                self.store = OHLCVStore()
+                if self.compact:
+                    # Compact frames are lossy, so keep them apart from full-precision ones
+                    self.store = OHLCVStore(os.path.join(self.store.root_dir, "compact"))
+            except OSError:
+                self.store = None  # Read-only filesystem etc. - fall back to memory only
     
     def get_stock_data(self, symbol: str, period: str, interval: str) -> Optional[pd.DataFrame]:
         """
@@ -26,38 +94,135 @@ class DataManager:
         Returns:
             DataFrame with OHLCV data or None if error
         """
-        cache_key = f"{symbol}_{period}_{interval}"
+        # Intervals Yahoo doesn't serve (e.g. 4h) are built from a finer series
+        if interval not in YAHOO_INTERVALS:
+            return self.get_timeframe_data(symbol, period, interval)
+        
+        cache_key = self._cache_key(symbol, period, interval)
         
         # Check cache first
-        if self._is_cache_valid(cache_key):
-            return self.data_cache[cache_key]['data']
+        cached = self.data_cache.get(cache_key)
+        if cached is not None:
+            self.cache_stats['memory_hits'] += 1
+            return cached
+        
+        # Threads asking for the same series at once (e.g. the 1wk and 1mo resamples both
+        # needing the 1d base) share one fetch: later ones wait and then read the cache
+        with self._fetch_lock(cache_key):
+            cached = self.data_cache.get(cache_key, record=False)
+            if cached is not None:
+                self.cache_stats['memory_hits'] += 1
+                return cached
+            
+            return self._fetch_stock_data(symbol, period, interval, cache_key)
+    
+    def _fetch_stock_data(self, symbol: str, period: str, interval: str, cache_key: str) -> Optional[pd.DataFrame]:
+        """get_stock_data after a memory cache miss: the persistent store, then Yahoo"""
+        stored = self._load_from_store(symbol, period, interval)
+        if stored is not None:
+            stored_data, meta = stored
+            
+            if self._is_store_fresh(meta, interval):
+                self.cache_stats['store_hits'] += 1
+                data = self._slice_period(stored_data, period)
+                self._cache_data(cache_key, data, interval)
+                return data
+            
+            # Stale but covering the period - only download the bars after the last stored one
+            merged = self._fetch_tail(symbol, interval, stored_data, meta)
+            if merged is not None:
+                self.cache_stats['tail_fetches'] += 1
+                data = self._slice_period(merged, period)
+                self._cache_data(cache_key, data, interval)
+                return data
+        
+        self.cache_stats['misses'] += 1
         
         try:
+            # Refresh the whole stored span if it is longer than the request, so the store never shrinks
+            fetch_period = self._get_fetch_period(symbol, period, interval)
+            
             # Create yfinance ticker object
-            ticker = yf.Ticker(symbol)
+            ticker = yf.Ticker(symbol, session=self.session)
             
             # Fetch data
-            data = ticker.history(period=period, interval=interval)
+            data = ticker.history(period=fetch_period, interval=interval)
             
             if data.empty:
+                if stored is not None:
+                    # Download failed - serve the stale stored bars, leaving the store stale so the next call retries
+                    return self._slice_period(stored[0], period)
                 st.error(f"No data found for symbol {symbol}")
                 return None
             
             # Clean and validate data
             data = self._clean_data(data)
             
+            self._save_to_store(symbol, interval, data, fetch_period)
+            if fetch_period != period:
+                data = self._slice_period(data, period)
+            
             # Cache the data
-            self.data_cache[cache_key] = {
-                'data': data,
-                'timestamp': datetime.now()
-            }
+            self._cache_data(cache_key, data, interval)
             
             return data
             
         except Exception as e:
+            if stored is not None:
+                return self._slice_period(stored[0], period)
             st.error(f"Error fetching data for {symbol}: {str(e)}")
             return None
     
+    def _fetch_lock(self, cache_key: str) -> threading.Lock:
+        with self._fetch_locks_lock:
+            return self._fetch_locks.setdefault(cache_key, threading.Lock())
+    
+    def get_timeframe_data(self, symbol: str, period: str, interval: str) -> Optional[pd.DataFrame]:
+        """
+        Get data for an interval, building it locally from a finer series already held
+        
+        Higher intervals (15m -> 1h -> 4h -> 1d -> 1wk -> 1mo) are resampled from the
+        coarsest finer series that is in the cache or the persistent store and covers
+        the period, so one download serves every timeframe. Falls back to fetching the
+        interval itself (or its finest base for intervals Yahoo doesn't serve).
+        
+        Args:
+            symbol: Stock ticker symbol
+            period: Data period
+            interval: Target interval
+            
+        Returns:
+            DataFrame with OHLCV data or None if error
+        """
+        cache_key = self._cache_key(symbol, period, interval)
+        cached = self.data_cache.get(cache_key)
+        if cached is not None:
+            self.cache_stats['memory_hits'] += 1
+            return cached
+        
+        base_data = None
+        for base_interval in RESAMPLE_BASES.get(interval, []):
+            base_data = self._get_held_series(symbol, period, base_interval)
+            if base_data is not None:
+                break
+        
+        if base_data is None:
+            if interval in YAHOO_INTERVALS:
+                return self.get_stock_data(symbol, period, interval)
+            if interval not in RESAMPLE_BASES:
+                st.error(f"Unsupported interval {interval}")
+                return None
+            base_data = self.get_stock_data(symbol, period, RESAMPLE_BASES[interval][0])
+            if base_data is None:
+                return None
+        
+        data = self._resample_ohlcv(base_data, interval, symbol)
+        if self.compact:
+            data = self._compact_frame(data)
+        self._cache_data(cache_key, data, interval)
+        
+        return data
+    
     def get_real_time_price(self, symbol: str) -> Optional[float]:
         """
         Get current/latest price for a symbol
@@ -68,18 +233,73 @@ class DataManager:
         Returns:
             Current price or None if error
         """
-        try:
-            ticker = yf.Ticker(symbol)
-            data = ticker.history(period="1d", interval="1m")
-            
-            if not data.empty:
-                return float(data['Close'].iloc[-1])
-            
-            return None
+        return self.get_latest_prices([symbol]).get(symbol)
+    
+    def get_latest_prices(self, symbols: List[str], max_age: Optional[float] = None) -> Dict[str, float]:
+        """
+        Get the latest price for many symbols with one multi-ticker request
+        
+        Prices younger than max_age seconds are served from the quote cache; the rest are
+        fetched together as 1m bars in a single Yahoo request. Symbols the request doesn't
+        return (or all of them if it fails) fall back to the last close of a cached or
+        stored 1m series.
+        
+        Args:
+            symbols: List of stock ticker symbols
+            max_age: Seconds a cached price stays usable (default: quote_ttl)
             
-        except Exception as e:
-            st.error(f"Error fetching real-time price for {symbol}: {str(e)}")
-            return None
+        Returns:
+            Dictionary with symbol as key and latest price as value; symbols without any
+            price are left out
+        """
+        max_age = self.quote_ttl if max_age is None else max_age
+        now = time.monotonic()
+        
+        prices = {}
+        with self._quotes_lock:
+            for symbol in symbols:
+                quote = self._quotes.get(symbol)
+                if quote is not None and now - quote[1] <= max_age:
+                    prices[symbol] = quote[0]
+        
+        missing = list(dict.fromkeys(symbol for symbol in symbols if symbol not in prices))
+        if not missing:
+            return prices
+        
+        frames = self._download_batch(missing, "1m", period="1d") or {}
+        fetched = {}
+        for symbol, frame in frames.items():
+            closes = frame['Close'].dropna() if 'Close' in frame.columns else None
+            if closes is not None and not closes.empty:
+                fetched[symbol] = float(closes.iloc[-1])
+        
+        fetched_at = time.monotonic()
+        with self._quotes_lock:
+            for symbol, price in fetched.items():
+                self._quotes[symbol] = (price, fetched_at)
+        prices.update(fetched)
+        
+        for symbol in missing:
+            if symbol not in prices:
+                price = self._held_last_price(symbol)
+                if price is not None:
+                    prices[symbol] = price
+        
+        return prices
+    
+    def _held_last_price(self, symbol: str) -> Optional[float]:
+        """Last close of a 1m series already in the memory cache or store, without any download"""
+        for period in PERIOD_ORDER:
+            cached = self.data_cache.get(self._cache_key(symbol, period, "1m"), record=False)
+            if cached is not None and not cached.empty:
+                return float(cached['Close'].iloc[-1])
+        
+        if self.store is not None:
+            loaded = self.store.load(symbol, "1m")
+            if loaded is not None and not loaded[0].empty:
+                return float(loaded[0]['Close'].iloc[-1])
+        
+        return None
     
     def get_stock_info(self, symbol: str) -> Optional[dict]:
         """
@@ -92,7 +312,7 @@ class DataManager:
             Dictionary with stock info or None if error
         """
         try:
-            ticker = yf.Ticker(symbol)
+            ticker = yf.Ticker(symbol, session=self.session)
             info = ticker.info
             
             # Extract relevant information
@@ -126,62 +346,556 @@ class DataManager:
             True if symbol is valid, False otherwise
         """
         try:
-            ticker = yf.Ticker(symbol)
+            ticker = yf.Ticker(symbol, session=self.session)
             data = ticker.history(period="1d")
             return not data.empty
         except:
             return False
     
-    def get_multiple_stocks_data(self, symbols: list, period: str = "1d", interval: str = "1h") -> dict:
+    def get_multiple_stocks_data(self, symbols: list, period: str = "1d", interval: str = "1h",
+                                 bulk: bool = True, batch_size: Optional[int] = None) -> dict:
         """
         Get data for multiple stocks
         
+        In bulk mode, symbols that aren't cached are downloaded with yfinance's
+        multi-ticker download in batches of batch_size, and stale stored series are
+        topped up with one batched tail request. Each symbol's frame is cleaned and
+        put into the cache and store like a single get_stock_data call.
+        
         Args:
             symbols: List of stock ticker symbols
             period: Data period
             interval: Data interval
+            bulk: Use batched multi-ticker requests instead of one request per symbol
+            batch_size: Symbols per request (defaults to self.bulk_batch_size)
             
         Returns:
             Dictionary with symbol as key and DataFrame as value
         """
         results = {}
         
+        if not bulk:
+            for symbol in symbols:
+                data = self.get_stock_data(symbol, period, interval)
+                if data is not None:
+                    results[symbol] = data
+            
+            return results
+        
+        # Intervals Yahoo doesn't serve are downloaded as their base and resampled afterwards
+        if interval in YAHOO_INTERVALS:
+            fetch_interval = interval
+        elif interval in RESAMPLE_BASES:
+            fetch_interval = RESAMPLE_BASES[interval][0]
+        else:
+            st.error(f"Unsupported interval {interval}")
+            return {}
+        batch_size = batch_size or self.bulk_batch_size
+        
+        missing = []
+        stale = {}
+        held = {}  # symbol -> stored series, served if its download fails
         for symbol in symbols:
-            data = self.get_stock_data(symbol, period, interval)
-            if data is not None:
-                results[symbol] = data
+            cache_key = self._cache_key(symbol, period, fetch_interval)
+            cached = self.data_cache.get(cache_key)
+            if cached is not None:
+                self.cache_stats['memory_hits'] += 1
+                results[symbol] = cached
+                continue
+            
+            stored = self._load_from_store(symbol, period, fetch_interval)
+            if stored is not None:
+                held[symbol] = stored[0]
+            
+            if stored is None:
+                missing.append(symbol)
+            elif self._is_store_fresh(stored[1], fetch_interval):
+                self.cache_stats['store_hits'] += 1
+                results[symbol] = self._slice_period(stored[0], period)
+                self._cache_data(cache_key, results[symbol], fetch_interval)
+            elif str(stored[0].index.tz) != str(self._exchange_timezone(symbol)):
+                missing.append(symbol)  # Stored in another timezone (older bulk download) - replace it
+            elif self._beyond_tail_limit(stored[0], fetch_interval):
+                missing.append(symbol)  # Too old for a tail request - download it in full
+            else:
+                stale[symbol] = stored
         
-        return results
+        # Stale series: one request per batch starting at the oldest last stored bar
+        stale_symbols = list(stale)
+        for start in range(0, len(stale_symbols), batch_size):
+            batch = stale_symbols[start:start + batch_size]
+            tail_start = min(stale[symbol][0].index[-1] for symbol in batch)
+            downloaded = self._download_batch(batch, fetch_interval, start=tail_start)
+            
+            for symbol in batch:
+                stored_data, meta = stale[symbol]
+                if downloaded is None:
+                    # Request failed - serve the stored bars rather than nothing
+                    results[symbol] = self._slice_period(stored_data, period)
+                    continue
+                
+                new_data = downloaded.get(symbol)
+                if new_data is None:
+                    # The request starts at or before this symbol's last stored bar, so no rows
+                    # means its download failed - serve the stored bars without marking them fresh
+                    results[symbol] = self._slice_period(stored_data, period)
+                    continue
+                
+                merged = self._merge_tail(symbol, fetch_interval, stored_data, meta,
+                                          new_data.loc[new_data.index >= stored_data.index[-1]])
+                if merged is None:
+                    missing.append(symbol)
+                    continue
+                self.cache_stats['tail_fetches'] += 1
+                results[symbol] = self._slice_period(merged, period)
+                self._cache_data(self._cache_key(symbol, period, fetch_interval), results[symbol], fetch_interval)
+        
+        # Missing series: full downloads in batches, grouped by the span to download, which
+        # is the stored span when that is longer than period so the store never shrinks
+        by_fetch_period = {}
+        for symbol in missing:
+            by_fetch_period.setdefault(self._get_fetch_period(symbol, period, fetch_interval), []).append(symbol)
+        
+        for fetch_period, group in by_fetch_period.items():
+            for start in range(0, len(group), batch_size):
+                batch = group[start:start + batch_size]
+                downloaded = self._download_batch(batch, fetch_interval, period=fetch_period) or {}
+                
+                for symbol in batch:
+                    self.cache_stats['misses'] += 1
+                    raw_data = downloaded.get(symbol)
+                    data = self._clean_data(raw_data) if raw_data is not None else None
+                    if data is None or data.empty:
+                        if symbol in held:
+                            # Download failed - serve the stored bars, leaving the store stale
+                            results[symbol] = self._slice_period(held[symbol], period)
+                        continue
+                    
+                    self._save_to_store(symbol, fetch_interval, data, fetch_period)
+                    if fetch_period != period:
+                        data = self._slice_period(data, period)
+                    self._cache_data(self._cache_key(symbol, period, fetch_interval), data, fetch_interval)
+                    results[symbol] = data
+        
+        if fetch_interval != interval:
+            results = {symbol: self.get_timeframe_data(symbol, period, interval) for symbol in results}
+        
+        # Keep the caller's symbol order
+        return {symbol: results[symbol] for symbol in symbols if results.get(symbol) is not None}
+    
+    def _download_batch(self, symbols: list, interval: str, period: Optional[str] = None,
+                        start: Optional[pd.Timestamp] = None) -> dict:
+        """
+        Download several symbols in one multi-ticker Yahoo request
+        
+        Args:
+            symbols: List of stock ticker symbols
+            interval: Data interval
+            period: Data period (used when start is not given)
+            start: Download bars from this timestamp onwards
+            
+        Returns:
+            Dictionary with symbol as key and raw (uncleaned) DataFrame as value;
+            symbols without data are left out. None if the request failed.
+        """
+        try:
+            if start is not None:
+                raw = yf.download(symbols, start=start, interval=interval, group_by='ticker',
+                                  auto_adjust=True, actions=True, progress=False, threads=True,
+                                  ignore_tz=False, session=self.session)
+            else:
+                raw = yf.download(symbols, period=period, interval=interval, group_by='ticker',
+                                  auto_adjust=True, actions=True, progress=False, threads=True,
+                                  ignore_tz=False, session=self.session)
+        except Exception as e:
+            st.error(f"Error downloading data for {', '.join(symbols)}: {str(e)}")
+            return None
+        
+        if raw is None or raw.empty:
+            return {}
+        
+        frames = {}
+        for symbol in symbols:
+            if isinstance(raw.columns, pd.MultiIndex):
+                if symbol not in raw.columns.get_level_values(0):
+                    continue
+                frame = raw[symbol]
+            else:
+                frame = raw  # Single ticker without a ticker level
+            
+            # Multi-ticker frames share one index; drop rows this symbol didn't trade
+            frame = frame.dropna(how='all')
+            if not frame.empty:
+                frames[symbol] = self._to_exchange_timezone(symbol, frame)
+        
+        return frames
+    
+    def _to_exchange_timezone(self, symbol: str, data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Put a downloaded frame in the symbol's exchange timezone, like Ticker.history
+        
+        yf.download returns a shared UTC index when the tickers' timezones differ, so
+        bulk frames are converted back before they meet single-symbol frames in the
+        cache and store.
+        """
+        tz = self._exchange_timezone(symbol)
+        if tz is None or not isinstance(data.index, pd.DatetimeIndex):
+            return data
+        if data.index.tz is None:
+            return data.tz_localize(tz)  # Naive bars are exchange wall-clock times
+        return data.tz_convert(tz)
+    
+    def _exchange_timezone(self, symbol: str) -> Optional[str]:
+        """Exchange timezone name of a symbol, or None if Yahoo can't tell"""
+        tz = self._exchange_tz.get(symbol)
+        if tz is not None:
+            return tz
+        
+        for suffix, zone in EXCHANGE_TIMEZONES.items():
+            if symbol.upper().endswith(suffix):
+                tz = zone
+                break
+        else:
+            try:
+                tz = yf.Ticker(symbol, session=self.session).fast_info['timezone']
+            except Exception:
+                return None
+        
+        if tz:
+            self._exchange_tz[symbol] = tz
+        return tz or None
     
     def _clean_data(self, data: pd.DataFrame) -> pd.DataFrame:
         """
         Clean and validate stock data
         
+        Drops bars with missing OHLC, repairs High/Low to bracket Open and Close, drops
+        flat (High == Low) bars, makes Volume non-negative and sorts by time. Works on the
+        column arrays directly: the only full-size allocation is the output frame, the
+        input frame is never modified.
+        
         Args:
             data: Raw DataFrame from yfinance
             
         Returns:
             Cleaned DataFrame
         """
-        # Remove any rows with missing OHLC data
-        data = data.dropna(subset=['Open', 'High', 'Low', 'Close'])
+        open_ = data['Open'].to_numpy(dtype=float)
+        close = data['Close'].to_numpy(dtype=float)
+        
+        # Ensure High >= Low, Open, Close (NaN in any price propagates, flagging the bar)
+        high = np.maximum(data['High'].to_numpy(dtype=float), data['Low'].to_numpy(dtype=float))
+        low = np.minimum(data['Low'].to_numpy(dtype=float), open_)
+        np.maximum(high, open_, out=high)
+        np.maximum(high, close, out=high)
+        np.minimum(low, close, out=low)
         
-        # Ensure High >= Low, Open, Close
-        data['High'] = data[['High', 'Open', 'Close', 'Low']].max(axis=1)
-        data['Low'] = data[['Low', 'Open', 'Close', 'High']].min(axis=1)
+        # Keep bars with complete OHLC and High != Low (NaN comparisons are False)
+        rows = np.flatnonzero(high > low)
         
-        # Remove any rows where High == Low (invalid data)
-        mask = data['High'] != data['Low']
-        data = data.loc[mask]
+        # Sort by index (datetime); yfinance data is nearly always sorted already
+        index = data.index[rows]
+        if not index.is_monotonic_increasing:
+            order = index.argsort(kind='stable')
+            rows = rows[order]
+            index = index[order]
         
-        # Ensure Volume is non-negative
-        data['Volume'] = data['Volume'].abs()
+        columns = {}
+        for col in data.columns:
+            if col == 'High':
+                columns[col] = high[rows]
+            elif col == 'Low':
+                columns[col] = low[rows]
+            elif col == 'Volume':
+                # Ensure Volume is non-negative
+                volume = data[col].to_numpy()[rows]
+                columns[col] = np.abs(volume, out=volume)
+            else:
+                columns[col] = data[col].to_numpy()[rows]
         
-        # Sort by index (datetime)
-        data = data.sort_index()
+        # copy=False: the freshly gathered column arrays become the frame's blocks as is
+        data = pd.DataFrame(columns, index=index, copy=False)
+        
+        if self.compact:
+            data = self._compact_frame(data)
         
         return data
     
+    def _compact_frame(self, data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Slim a cleaned frame down to float32 OHLC and uint32 volume
+        
+        Extra yfinance columns (Dividends, Stock Splits) are dropped. The DatetimeIndex
+        is kept as is - it is already stored as int64 epoch nanoseconds. Volume falls back
+        to float32 if it has gaps or doesn't fit in uint32.
+        
+        Args:
+            data: Cleaned DataFrame
+            
+        Returns:
+            Compact DataFrame with only Open, High, Low, Close, Volume
+        """
+        dtypes = {col: np.float32 for col in ['Open', 'High', 'Low', 'Close']}
+        
+        if 'Volume' in data.columns:
+            volume = data['Volume']
+            fits_uint32 = volume.notna().all() and (volume.empty or (volume.min() >= 0 and volume.max() < 2 ** 32))
+            dtypes['Volume'] = np.uint32 if fits_uint32 else np.float32
+        
+        return data[list(dtypes)].astype(dtypes)
+    
+    def _cache_key(self, symbol: str, period: str, interval: str) -> str:
+        """Memory cache key; compact frames get their own keys in the shared cache"""
+        cache_key = f"{symbol}_{period}_{interval}"
+        return f"{cache_key}_compact" if self.compact else cache_key
+    
+    def _cache_data(self, cache_key: str, data: pd.DataFrame, interval: str):
+        """Put a cleaned frame into the shared in-process cache"""
+        self.data_cache.put(cache_key, data, interval)
+    
+    def _load_from_store(self, symbol: str, period: str, interval: str) -> Optional[tuple]:
+        """
+        Read a series from the persistent store if it covers the period
+        
+        Args:
+            symbol: Stock ticker symbol
+            period: Requested data period
+            interval: Data interval
+            
+        Returns:
+            Tuple of (full stored DataFrame, metadata) or None if the store can't serve it
+        """
+        if self.store is None:
+            return None
+        
+        meta = self.store.get_metadata(symbol, interval)
+        if meta is None or not self._period_covers(meta.get('period'), period):
+            return None
+        
+        loaded = self.store.load(symbol, interval)
+        if loaded is None or loaded[0].empty:
+            return None
+        
+        return loaded
+    
+    def _is_store_fresh(self, meta: dict, interval: str) -> bool:
+        """Check if a stored series was refreshed within the interval's cache TTL"""
+        fetched_at = datetime.fromisoformat(meta['fetched_at'])
+        return (datetime.now() - fetched_at).total_seconds() < self._get_ttl(interval)
+    
+    def _get_ttl(self, interval: str) -> int:
+        """Cache TTL in seconds for an interval, falling back to cache_duration"""
+        return self.data_cache.ttls.get(interval, self.cache_duration)
+    
+    def _fetch_tail(self, symbol: str, interval: str, stored: pd.DataFrame, meta: dict) -> Optional[pd.DataFrame]:
+        """
+        Download only the bars since the last stored timestamp and merge them in
+        
+        The last stored bar is requested again because it may have been an unfinished
+        candle. Only the new rows go through _clean_data.
+        
+        Args:
+            symbol: Stock ticker symbol
+            interval: Data interval
+            stored: Full stored DataFrame
+            meta: Stored metadata
+            
+        Returns:
+            Merged DataFrame trimmed to the stored period, or None if a full fetch is needed
+        """
+        last_timestamp = stored.index[-1]
+        
+        # Gap older than the stored span - a full download is no bigger
+        if self._slice_period(stored, meta['period']).empty:
+            return None
+        
+        # Yahoo refuses intraday requests reaching too far back
+        if self._beyond_tail_limit(stored, interval):
+            return None
+        
+        try:
+            ticker = yf.Ticker(symbol, session=self.session)
+            new_data = ticker.history(start=last_timestamp, interval=interval)
+        except Exception:
+            return None
+        
+        return self._merge_tail(symbol, interval, stored, meta, new_data)
+    
+    def _beyond_tail_limit(self, stored: pd.DataFrame, interval: str) -> bool:
+        """Check if the bars since the last stored one are older than Yahoo serves for the interval"""
+        limit = INTRADAY_TAIL_LIMITS.get(interval)
+        if limit is None:
+            return False
+        last_timestamp = stored.index[-1]
+        return pd.Timestamp.now(tz=last_timestamp.tz) - last_timestamp > limit
+    
+    def _merge_tail(self, symbol: str, interval: str, stored: pd.DataFrame, meta: dict,
+                    new_data: pd.DataFrame) -> Optional[pd.DataFrame]:
+        """
+        Clean newly downloaded bars, merge them into the stored series and write it back
+        
+        The tail request starts at the last stored bar, so a successful download always
+        contains it (the market being closed just means no bars after it). An empty
+        download is a failed request (rate limit, range limit, ...) and must not be
+        taken as "nothing new".
+        
+        Returns:
+            Merged DataFrame, or None if the download failed or the stored series is in
+            a different timezone and has to be downloaded again
+        """
+        if new_data.empty or str(new_data.index.tz) != str(stored.index.tz):
+            return None
+        
+        # Replace stored rows from the first re-downloaded bar onwards
+        kept = stored.loc[stored.index < new_data.index[0]]
+        new_rows = self._clean_data(new_data)[kept.columns.intersection(new_data.columns)]
+        merged = pd.concat([kept, new_rows])
+        merged = self._slice_period(merged, meta['period'])
+        
+        self._save_to_store(symbol, interval, merged, meta['period'])
+        
+        return merged
+    
+    def _save_to_store(self, symbol: str, interval: str, data: pd.DataFrame, period: str):
+        """Write a cleaned series to the persistent store, ignoring disk errors"""
+        if self.store is None:
+            return
+        
+        try:
+            self.store.save(symbol, interval, data, period)
+        except OSError:
+            pass
+    
+    def _get_fetch_period(self, symbol: str, period: str, interval: str) -> str:
+        """Period to download: the requested one, or the stored span if that is longer"""
+        if self.store is None:
+            return period
+        
+        meta = self.store.get_metadata(symbol, interval)
+        if meta is not None and self._period_covers(meta.get('period'), period):
+            return meta['period']
+        
+        return period
+    
+    def _period_covers(self, stored_period: Optional[str], period: str) -> bool:
+        """Check if a series fetched for stored_period also contains everything in period"""
+        if stored_period == period:
+            return True
+        if stored_period not in PERIOD_ORDER or period not in PERIOD_ORDER:
+            return False
+        return PERIOD_ORDER.index(stored_period) >= PERIOD_ORDER.index(period)
+    
+    def _slice_period(self, data: pd.DataFrame, period: str) -> pd.DataFrame:
+        """
+        Cut a longer series down to a Yahoo-style period
+        
+        Day periods count trading sessions ("5d" = last 5 sessions); longer periods
+        are calendar spans back from now, like Yahoo computes the start date.
+        
+        Args:
+            data: Cleaned DataFrame with a DatetimeIndex
+            period: Period to keep
+            
+        Returns:
+            Sliced DataFrame
+        """
+        if data.empty or period == "max" or period not in PERIOD_ORDER:
+            return data
+        
+        if period.endswith("d"):
+            sessions = data.index.normalize().unique()
+            first_session = sessions[-int(period[:-1]):][0]
+            return data.loc[data.index >= first_session]
+        
+        if period.endswith("mo"):
+            offset = pd.DateOffset(months=int(period[:-2]))
+        else:
+            offset = pd.DateOffset(years=int(period[:-1]))
+        
+        start = pd.Timestamp.now(tz=data.index.tz).normalize() - offset
+        return data.loc[data.index >= start]
+    
+    def _get_held_series(self, symbol: str, period: str, interval: str) -> Optional[pd.DataFrame]:
+        """Get a series covering the period if it is already cached or stored, without a full download"""
+        if interval not in YAHOO_INTERVALS:
+            return self.data_cache.get(self._cache_key(symbol, period, interval), record=False)
+        
+        for held_period in PERIOD_ORDER[PERIOD_ORDER.index(period):] if period in PERIOD_ORDER else [period]:
+            cached = self.data_cache.get(self._cache_key(symbol, held_period, interval), record=False)
+            if cached is not None:
+                return self._slice_period(cached, period)
+        
+        if self.store is not None:
+            meta = self.store.get_metadata(symbol, interval)
+            if meta is not None and self._period_covers(meta.get('period'), period):
+                # Served from the store, topped up with a tail fetch if stale
+                return self.get_stock_data(symbol, period, interval)
+        
+        return None
+    
+    def _resample_ohlcv(self, data: pd.DataFrame, interval: str, symbol: str) -> pd.DataFrame:
+        """
+        Aggregate a finer OHLCV series into a higher interval
+        
+        Intraday bins are anchored to the exchange session open (09:15 for NSE), so
+        1h bars start at :15 and 4h bars at 09:15 and 13:15 like Yahoo's own bars.
+        Weekly bars start on Monday and monthly bars on the 1st.
+        
+        Args:
+            data: Cleaned DataFrame in the exchange timezone
+            interval: Target interval
+            symbol: Stock ticker symbol, used to look up the session open
+            
+        Returns:
+            Resampled OHLCV DataFrame
+        """
+        rule = RESAMPLE_RULES[interval]
+        options = {}
+        
+        if interval in ("5m", "15m", "1h", "4h"):
+            options['offset'] = self._get_session_open(symbol, data) % pd.Timedelta(rule)
+        elif interval == "1wk":
+            options.update(closed='left', label='left')
+        
+        aggregation = {'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'}
+        aggregation = {col: func for col, func in aggregation.items() if col in data.columns}
+        
+        resampled = data.resample(rule, **options).agg(aggregation)
+        
+        # Drop bins outside trading sessions
+        return resampled.dropna(subset=['Open'])
+    
+    def _get_session_open(self, symbol: str, data: pd.DataFrame) -> pd.Timedelta:
+        """Session open as time since midnight, from the exchange table or the earliest bar of the day"""
+        for suffix, open_time in SESSION_OPENS.items():
+            if symbol.upper().endswith(suffix):
+                return pd.Timedelta(f"{open_time}:00")
+        
+        if data.empty:
+            return pd.Timedelta(0)
+        return (data.index - data.index.normalize()).min()
+    
+    def get_cache_stats(self) -> dict:
+        """
+        Get cache hit/miss counters and memory cache size
+        
+        Returns:
+            Dictionary with memory hits, store hits, tail fetches, misses and overall hit
+            rate (requests served without a download, out of all requests) for this
+            DataManager, plus entries, bytes, memory budget, evictions and expirations of
+            the shared memory cache
+        """
+        stats = dict(self.cache_stats)
+        total = stats['memory_hits'] + stats['store_hits'] + stats['tail_fetches'] + stats['misses']
+        stats['hit_rate'] = (stats['memory_hits'] + stats['store_hits']) / total if total else 0.0
+        
+        memory_stats = self.data_cache.get_stats()
+        for key in ('entries', 'bytes', 'memory_budget', 'evictions', 'expirations'):
+            stats[key] = memory_stats[key]
+        stats['memory_hit_rate'] = memory_stats['hit_rate']
+        
+        return stats
+    
     def _is_cache_valid(self, cache_key: str) -> bool:
         """
         Check if cached data is still valid
@@ -192,16 +906,26 @@ class DataManager:
         Returns:
             True if cache is valid, False otherwise
         """
-        if cache_key not in self.data_cache:
-            return False
-        
-        cache_time = self.data_cache[cache_key]['timestamp']
-        return (datetime.now() - cache_time).total_seconds() < self.cache_duration
+        return self.data_cache.get(cache_key, record=False) is not None
     
     def clear_cache(self):
         """Clear all cached data"""
         self.data_cache.clear()
     
+    def invalidate(self, symbol: str):
+        """
+        Make the next request for a symbol fetch new bars
+        
+        Drops the symbol's frames from the memory cache (every period, interval and
+        resampled timeframe) and its held quote, and marks its stored series stale so
+        they are refreshed by a tail fetch instead of being served as they are.
+        """
+        self.data_cache.invalidate(f"{symbol}_")
+        with self._quotes_lock:
+            self._quotes.pop(symbol, None)
+        if self.store is not None:
+            self.store.expire(symbol)
+    
     def get_market_hours_data(self, symbol: str) -> dict:
         """
         Get market hours information for a symbol
@@ -213,7 +937,7 @@ class DataManager:
             Dictionary with market hours info
         """
         try:
-            ticker = yf.Ticker(symbol)
+            ticker = yf.Ticker(symbol, session=self.session)
             info = ticker.info
             
             # Basic market hours (US market default)
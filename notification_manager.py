@@ -1,28 +1,65 @@
 import smtplib
 import os
+import queue
+import threading
+import time
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from datetime import datetime
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 import streamlit as st
 
 class NotificationManager:
     """
     Manages email notifications for zone alerts
+    
+    By default alerts are handed to a background sender thread through a bounded queue,
+    so send_alert returns straight away. The sender keeps one authenticated SMTP
+    connection open between messages (closing it after idle_timeout seconds without
+    mail), reconnects when the server drops it and retries failed sends with
+    exponential backoff. background=False sends synchronously on the caller's thread.
+    
+    With a digest_window (seconds, background mode only) alerts aren't mailed one by one:
+    the first alert for a recipient opens a window, later ones join it (a repeat of the
+    same symbol/zone replaces the earlier row) and when the window closes they go out as
+    one email with a row per alert.
     """
     
-    def __init__(self):
+    def __init__(self, smtp_server: str = "smtp.gmail.com", smtp_port: int = 587, use_tls: bool = True,
+                 background: bool = True, queue_size: int = 100, max_retries: int = 3,
+                 retry_backoff: float = 1.0, idle_timeout: float = 60.0,
+                 digest_window: Optional[float] = None):
         self.email_address = None
-        self.smtp_server = "smtp.gmail.com"
-        self.smtp_port = 587
+        self.smtp_server = smtp_server
+        self.smtp_port = smtp_port
+        self.use_tls = use_tls  # STARTTLS before login; off for local test servers
         self.sender_email = os.getenv("SMTP_EMAIL", "trading.alerts@example.com")
-        self.sender_password = os.getenv("SMTP_PASSWORD", "your_app_password")
+        self.sender_password = os.getenv("SMTP_PASSWORD", "your_app_password")  # Empty/None skips login
+        
+        self.background = background
+        self.max_retries = max_retries  # Retries per message after the first attempt
+        self.retry_backoff = retry_backoff  # Seconds before the first retry, doubled for each further one
+        self.idle_timeout = idle_timeout  # Close the pooled connection after this many idle seconds
+        self.digest_window = digest_window  # Seconds alerts are collected into one email; None/0 sends each alert
+        self.send_stats = {'sent': 0, 'failed': 0, 'dropped': 0, 'retries': 0, 'connects': 0}
+        self.last_error = None
+        self._stats_lock = threading.Lock()  # Counters are bumped from callers and the sender thread
+        
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._server = None  # Pooled smtplib.SMTP connection
+        self._server_lock = threading.Lock()
+        self._worker = None
+        self._worker_lock = threading.Lock()
+        self._stop_event = threading.Event()  # Stop signal of the current sender; each sender gets its own
+        self._digests = {}  # recipient -> {'due': time.monotonic() deadline, 'alerts': {zone key: alert}}
+        self._digest_lock = threading.Lock()
     
     def set_email(self, email: str):
         """Set the recipient email address"""
         self.email_address = email
     
-    def send_alert(self, message: str, symbol: str, zone: Dict, current_price: float) -> bool:
+    def send_alert(self, message: str, symbol: str, zone: Dict, current_price: float,
+                   recipient: Optional[str] = None, digest_window: Optional[float] = None) -> bool:
         """
         Send email alert for zone proximity
         
@@ -31,49 +68,308 @@ class NotificationManager:
             symbol: Stock symbol
             zone: Zone dictionary with details
             current_price: Current stock price
+            recipient: Email address to send to instead of email_address
+            digest_window: Digest window for this alert instead of the manager's digest_window
             
         Returns:
-            bool: True if email sent successfully, False otherwise
+            bool: True if the email was sent (or, in background mode, queued for sending),
+            False otherwise
         """
-        if not self.email_address:
+        recipient = recipient or self.email_address
+        if not recipient:
             st.warning("No email address configured for alerts")
             return False
         
+        if digest_window is None:
+            digest_window = self.digest_window
+        if digest_window and self.background:
+            return self._add_to_digest(recipient, digest_window, message, symbol, zone, current_price)
+        
         try:
-            # Create email content
-            subject = f"🚨 Zone Alert: {symbol} - {zone['type'].title()} Zone"
-            
-            # Create HTML email body
-            html_body = self._create_html_email_body(symbol, zone, current_price, message)
+            msg = self._create_alert_message(recipient, message, symbol, zone, current_price)
             
-            # Create email message
-            msg = MIMEMultipart('alternative')
-            msg['Subject'] = subject
-            msg['From'] = self.sender_email
-            msg['To'] = self.email_address
-            
-            # Add HTML content
-            html_part = MIMEText(html_body, 'html')
-            msg.attach(html_part)
-            
-            # Add plain text fallback
-            text_body = self._create_text_email_body(symbol, zone, current_price, message)
-            text_part = MIMEText(text_body, 'plain')
-            msg.attach(text_part)
+            if self.background:
+                return self._enqueue(msg)
             
             # Send email
-            server = smtplib.SMTP(self.smtp_server, self.smtp_port)
-            server.starttls()
-            server.login(self.sender_email, self.sender_password)
-            server.send_message(msg)
-            server.quit()
-            
+            self._deliver(msg)
             return True
             
         except Exception as e:
             st.error(f"Failed to send email notification: {str(e)}")
             return False
     
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Close any open digests and wait for the background sender to work through the queue
+        
+        Returns:
+            bool: True if the queue drained within timeout
+        """
+        self._release_digests(force=True)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+        return True
+    
+    def close(self, timeout: Optional[float] = 10.0):
+        """Send what is queued (waiting up to timeout), stop the sender and close the connection"""
+        self.flush(timeout)
+        with self._worker_lock:
+            self._stop_event.set()
+            worker, self._worker = self._worker, None
+        if worker is not None:
+            try:
+                self._queue.put_nowait(None)  # Wake the sender
+            except queue.Full:
+                pass
+            worker.join(timeout)
+            # A sender still stuck in a send exits on its own stop event once it returns; the
+            # wake-up it never read mustn't linger for the next sender or keep flush waiting
+            self._drain_wakeups()
+            if worker.is_alive():
+                return  # It holds the connection until then and closes it on the way out
+        self._disconnect()
+    
+    def get_send_stats(self) -> dict:
+        """Sent, failed, dropped (queue full) and retried messages, connections opened and queue length"""
+        with self._stats_lock:
+            stats = dict(self.send_stats)
+            stats['last_error'] = self.last_error
+        stats['queued'] = self._queue.qsize()
+        with self._digest_lock:
+            stats['digest_pending'] = sum(len(digest['alerts']) for digest in self._digests.values())
+        return stats
+    
+    def _count(self, key: str, error: Optional[str] = None):
+        """Bump a send_stats counter, recording error as last_error if given"""
+        with self._stats_lock:
+            self.send_stats[key] += 1
+            if error is not None:
+                self.last_error = error
+    
+    def _create_alert_message(self, recipient: str, message: str, symbol: str, zone: Dict,
+                              current_price: float) -> MIMEMultipart:
+        """Build the email for a single alert"""
+        # Create email content
+        subject = f"🚨 Zone Alert: {symbol} - {zone['type'].title()} Zone"
+        
+        # Create HTML email body
+        html_body = self._create_html_email_body(symbol, zone, current_price, message)
+        
+        # Create email message
+        msg = MIMEMultipart('alternative')
+        msg['Subject'] = subject
+        msg['From'] = self.sender_email
+        msg['To'] = recipient
+        
+        # Add HTML content
+        html_part = MIMEText(html_body, 'html')
+        msg.attach(html_part)
+        
+        # Add plain text fallback
+        text_body = self._create_text_email_body(symbol, zone, current_price, message)
+        text_part = MIMEText(text_body, 'plain')
+        msg.attach(text_part)
+        
+        return msg
+    
+    def _create_digest_message(self, recipient: str, alerts: List[Dict]) -> MIMEMultipart:
+        """Build one email for all alerts of a digest; a single alert gets the regular email"""
+        if len(alerts) == 1:
+            alert = alerts[0]
+            return self._create_alert_message(recipient, alert['message'], alert['symbol'],
+                                              alert['zone'], alert['current_price'])
+        
+        symbols = list(dict.fromkeys(alert['symbol'] for alert in alerts))
+        symbol_list = ", ".join(symbols[:5]) + (f" +{len(symbols) - 5} more" if len(symbols) > 5 else "")
+        
+        msg = MIMEMultipart('alternative')
+        msg['Subject'] = f"🚨 Zone Alerts: {len(alerts)} alerts - {symbol_list}"
+        msg['From'] = self.sender_email
+        msg['To'] = recipient
+        msg.attach(MIMEText(self._create_html_digest_body(alerts), 'html'))
+        msg.attach(MIMEText(self._create_text_digest_body(alerts), 'plain'))
+        
+        return msg
+    
+    def _add_to_digest(self, recipient: str, digest_window: float, message: str, symbol: str, zone: Dict,
+                       current_price: float) -> bool:
+        """Add an alert to the recipient's open digest, opening one (digest_window seconds long) if needed"""
+        alert = {
+            'message': message,
+            'symbol': symbol,
+            'zone': dict(zone),
+            'current_price': current_price,
+            'time': datetime.now()
+        }
+        
+        with self._digest_lock:
+            digest = self._digests.get(recipient)
+            opened = digest is None
+            if opened:
+                digest = self._digests[recipient] = {'due': time.monotonic() + digest_window, 'alerts': {}}
+            digest['alerts'][(symbol, zone['type'], zone['level'])] = alert
+        
+        self._ensure_worker()
+        if opened:
+            self._wake()  # The sender may be sleeping past the new digest's deadline
+        return True
+    
+    def _release_digests(self, force: bool = False):
+        """Queue the email of every digest whose window has closed (all of them if force)"""
+        now = time.monotonic()
+        with self._digest_lock:
+            due = [recipient for recipient, digest in self._digests.items() if force or digest['due'] <= now]
+            digests = [(recipient, self._digests.pop(recipient)) for recipient in due]
+        
+        for recipient, digest in digests:
+            alerts = list(digest['alerts'].values())
+            try:
+                self._queue.put_nowait(self._create_digest_message(recipient, alerts))
+            except queue.Full:
+                self._count('dropped')
+            except Exception as e:
+                self._count('failed', str(e))
+    
+    def _next_wait(self) -> float:
+        """Seconds the sender may block waiting for mail: until the next digest closes or the idle timeout"""
+        with self._digest_lock:
+            if not self._digests:
+                return self.idle_timeout
+            next_due = min(digest['due'] for digest in self._digests.values())
+        return max(0.0, min(self.idle_timeout, next_due - time.monotonic()))
+    
+    def _wake(self):
+        try:
+            self._queue.put_nowait(None)
+        except queue.Full:
+            pass  # A full queue wakes the sender anyway
+    
+    def _drain_wakeups(self):
+        """Take unread wake-up sentinels out of the queue, keeping queued mail in order"""
+        pending = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            self._queue.task_done()
+            if item is not None:
+                pending.append(item)
+        
+        for msg in pending:
+            try:
+                self._queue.put_nowait(msg)
+            except queue.Full:
+                self._count('dropped')
+    
+    def _enqueue(self, msg) -> bool:
+        """Hand a message to the background sender; False if the queue is full"""
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait(msg)
+            return True
+        except queue.Full:
+            self._count('dropped')
+            return False
+    
+    def _ensure_worker(self):
+        with self._worker_lock:
+            if self._worker is not None and self._worker.is_alive():
+                return
+            # A fresh event, so a previous sender still finishing a send keeps its stop signal
+            self._stop_event = threading.Event()
+            self._worker = threading.Thread(target=self._run, args=(self._stop_event,), name="smtp-sender",
+                                            daemon=True)
+            self._worker.start()
+    
+    def _run(self, stop_event: threading.Event):
+        """Background sender loop, until stop_event is set"""
+        last_activity = time.monotonic()
+        while not stop_event.is_set():
+            self._release_digests()
+            try:
+                msg = self._queue.get(timeout=self._next_wait())
+            except queue.Empty:
+                if time.monotonic() - last_activity >= self.idle_timeout:
+                    self._disconnect()  # Don't hold an idle connection the server will drop anyway
+                continue
+            
+            try:
+                if msg is not None:
+                    self._deliver(msg, stop_event)
+                    last_activity = time.monotonic()
+            except Exception as e:
+                self._count('failed', str(e))
+            finally:
+                self._queue.task_done()
+        
+        with self._worker_lock:
+            replaced = self._worker is not None  # A newer sender now owns the pooled connection
+        if not replaced:
+            self._disconnect()
+    
+    def _deliver(self, msg, stop_event: Optional[threading.Event] = None):
+        """
+        Send a message over the pooled connection, reconnecting and retrying on failure
+        
+        A failure on a reused connection (typically the server having closed it) is
+        retried at once on a new one; other failures back off before retrying, giving up
+        when stop_event (the manager's current one by default) is set.
+        """
+        stop_event = stop_event or self._stop_event
+        attempt = 0
+        while True:
+            with self._server_lock:
+                reused = self._server is not None
+                try:
+                    if self._server is None:
+                        self._server = self._open_connection()
+                        self._count('connects')
+                    self._server.send_message(msg)
+                    self._count('sent')
+                    return
+                except (smtplib.SMTPException, OSError) as e:
+                    self._disconnect_locked()
+                    if reused:
+                        continue
+                    if attempt >= self.max_retries or isinstance(e, smtplib.SMTPRecipientsRefused):
+                        raise
+            
+            self._count('retries')
+            if stop_event.wait(self.retry_backoff * 2 ** attempt):
+                raise smtplib.SMTPException("Sender stopped before the message could be sent")
+            attempt += 1
+    
+    def _open_connection(self) -> smtplib.SMTP:
+        """Connect, upgrade to TLS and log in"""
+        server = smtplib.SMTP(self.smtp_server, self.smtp_port, timeout=30)
+        try:
+            if self.use_tls:
+                server.starttls()
+            if self.sender_password:
+                server.login(self.sender_email, self.sender_password)
+        except Exception:
+            server.close()
+            raise
+        return server
+    
+    def _disconnect(self):
+        with self._server_lock:
+            self._disconnect_locked()
+    
+    def _disconnect_locked(self):
+        if self._server is None:
+            return
+        try:
+            self._server.quit()
+        except (smtplib.SMTPException, OSError):
+            self._server.close()
+        self._server = None
+    
     def _create_html_email_body(self, symbol: str, zone: Dict, current_price: float, message: str) -> str:
         """Create HTML email body"""
         zone_color = "#e74c3c" if zone['type'] == 'supply' else "#27ae60"
@@ -161,6 +457,88 @@ Price Direction: {direction} zone level
 
 ⚠️ This is an automated alert. Please conduct your own analysis before making trading decisions.
 
+---
+This alert was generated by your Stock Trading Dashboard.
+If you no longer wish to receive these alerts, please update your settings in the dashboard.
+        """
+        
+        return text_body
+    
+    def _create_html_digest_body(self, alerts: List[Dict]) -> str:
+        """Create HTML email body with one table row per alert"""
+        rows = ""
+        for alert in alerts:
+            zone = alert['zone']
+            current_price = alert['current_price']
+            zone_color = "#e74c3c" if zone['type'] == 'supply' else "#27ae60"
+            distance_pct = abs(zone['level'] - current_price) / current_price * 100
+            rows += f"""
+                    <tr>
+                        <td>{alert['time'].strftime('%H:%M:%S')}</td>
+                        <td><strong>{alert['symbol']}</strong></td>
+                        <td style="color: {zone_color};">{zone['type'].title()}</td>
+                        <td>${zone['level']:.2f}</td>
+                        <td>${current_price:.2f}</td>
+                        <td>{distance_pct:.2f}%</td>
+                        <td>{"Above" if current_price > zone['level'] else "Below"}</td>
+                        <td>{str(zone.get('strength', '')).title()}</td>
+                    </tr>"""
+        
+        html_body = f"""
+        <!DOCTYPE html>
+        <html>
+        <head>
+            <style>
+                body {{ font-family: Arial, sans-serif; margin: 20px; }}
+                .header {{ background-color: #34495e; color: white; padding: 15px; border-radius: 5px; }}
+                .content {{ padding: 20px; border: 1px solid #ddd; border-radius: 5px; margin-top: 10px; }}
+                table {{ border-collapse: collapse; width: 100%; }}
+                th, td {{ padding: 8px; border-bottom: 1px solid #ddd; text-align: left; }}
+                th {{ background-color: #f8f9fa; }}
+                .alert {{ color: #e74c3c; font-weight: bold; }}
+                .footer {{ margin-top: 20px; font-size: 0.9em; color: #666; }}
+            </style>
+        </head>
+        <body>
+            <div class="header">
+                <h2>🚨 Stock Trading Alerts</h2>
+                <p>{len(alerts)} zone alerts at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
+            </div>
+            
+            <div class="content">
+                <table>
+                    <tr>
+                        <th>Time</th><th>Symbol</th><th>Zone Type</th><th>Zone Level</th>
+                        <th>Current Price</th><th>Distance</th><th>Price Direction</th><th>Strength</th>
+                    </tr>{rows}
+                </table>
+                
+                <p class="alert">⚠️ This is an automated alert. Please conduct your own analysis before making trading decisions.</p>
+            </div>
+            
+            <div class="footer">
+                <p>This alert was generated by your Stock Trading Dashboard.</p>
+                <p>If you no longer wish to receive these alerts, please update your settings in the dashboard.</p>
+            </div>
+        </body>
+        </html>
+        """
+        
+        return html_body
+    
+    def _create_text_digest_body(self, alerts: List[Dict]) -> str:
+        """Create plain text digest body as fallback"""
+        lines = "\n".join(f"- {alert['time'].strftime('%H:%M:%S')} {alert['message']} (price ${alert['current_price']:.2f})"
+                          for alert in alerts)
+        
+        text_body = f"""
+STOCK TRADING ALERTS
+{len(alerts)} zone alerts at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+
+{lines}
+
+⚠️ This is an automated alert. Please conduct your own analysis before making trading decisions.
+
 ---
 This alert was generated by your Stock Trading Dashboard.
 If you no longer wish to receive these alerts, please update your settings in the dashboard.
@@ -171,9 +549,7 @@ If you no longer wish to receive these alerts, please update your settings in th
     def test_email_connection(self) -> bool:
         """Test email connection and credentials"""
         try:
-            server = smtplib.SMTP(self.smtp_server, self.smtp_port)
-            server.starttls()
-            server.login(self.sender_email, self.sender_password)
+            server = self._open_connection()
             server.quit()
             return True
         except Exception as e:
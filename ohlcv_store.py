@@ -0,0 +1,143 @@
+import os
+import json
+import tempfile
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from typing import Optional, Dict, Tuple
+from urllib.parse import quote
+
+DEFAULT_STORE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "zonealert", "ohlcv")
+
+class OHLCVStore:
+    """
+    Persistent on-disk store for cleaned OHLCV series
+    
+    Each (symbol, interval) series is kept as one NumPy structured array (.npy) that is
+    opened memory-mapped on read, plus a small JSON sidecar with the covered period,
+    timezone and fetch time. Files are replaced atomically so several processes and
+    Streamlit sessions can share one store directory.
+    """
+    
+    def __init__(self, root_dir: Optional[str] = None):
+        self.root_dir = root_dir or os.getenv("OHLCV_STORE_DIR", DEFAULT_STORE_DIR)
+        os.makedirs(self.root_dir, exist_ok=True)
+    
+    def load(self, symbol: str, interval: str) -> Optional[Tuple[pd.DataFrame, Dict]]:
+        """
+        Load a stored series
+        
+        Args:
+            symbol: Stock ticker symbol
+            interval: Data interval
+        
+        Returns:
+            Tuple of (DataFrame, metadata) or None if nothing usable is stored
+        """
+        meta = self.get_metadata(symbol, interval)
+        if meta is None:
+            return None
+        
+        try:
+            records = np.load(self._data_path(symbol, interval), mmap_mode='r')
+        except (OSError, ValueError):
+            return None
+        
+        index = pd.DatetimeIndex(np.asarray(records['timestamp']).astype('datetime64[ns]'))
+        if meta.get('tz'):
+            index = index.tz_localize('UTC').tz_convert(meta['tz'])
+        index.name = meta.get('index_name')
+        
+        columns = [name for name in records.dtype.names if name != 'timestamp']
+        data = pd.DataFrame({name: np.array(records[name]) for name in columns}, index=index)
+        
+        return data, meta
+    
+    def save(self, symbol: str, interval: str, data: pd.DataFrame, period: str):
+        """
+        Store a cleaned series, replacing whatever was stored for (symbol, interval)
+        
+        Args:
+            symbol: Stock ticker symbol
+            interval: Data interval
+            data: Cleaned DataFrame with a DatetimeIndex
+            period: Period the series covers (e.g. "1y")
+        """
+        index = pd.DatetimeIndex(data.index)
+        tz = str(index.tz) if index.tz is not None else None
+        if tz:
+            index = index.tz_convert('UTC').tz_localize(None)
+        
+        # Only numeric columns can live in a memory-mappable array
+        columns = [col for col in data.columns if pd.api.types.is_numeric_dtype(data[col])]
+        dtype = [('timestamp', '<i8')] + [(str(col), data[col].dtype.str) for col in columns]
+        records = np.empty(len(data), dtype=dtype)
+        records['timestamp'] = index.as_unit('ns').asi8
+        for col in columns:
+            records[str(col)] = data[col].to_numpy()
+        
+        meta = {
+            'symbol': symbol,
+            'interval': interval,
+            'period': period,
+            'tz': tz,
+            'index_name': data.index.name,
+            'rows': len(data),
+            'last_timestamp': data.index[-1].isoformat() if len(data) else None,
+            'fetched_at': datetime.now().isoformat()
+        }
+        
+        self._atomic_write(self._data_path(symbol, interval), lambda f: np.save(f, records))
+        self._atomic_write(self._meta_path(symbol, interval), lambda f: f.write(json.dumps(meta).encode()))
+    
+    def expire(self, symbol: str):
+        """Mark every stored interval of a symbol as stale, so the next read refreshes it"""
+        prefix = self._base_name(symbol, '')
+        for name in os.listdir(self.root_dir):
+            if name.startswith(prefix) and name.endswith('.json'):
+                interval = name[len(prefix):-len('.json')]
+                meta = self.get_metadata(symbol, interval)
+                if meta is None:
+                    continue
+                
+                meta['fetched_at'] = datetime.min.isoformat()
+                self._atomic_write(self._meta_path(symbol, interval), lambda f: f.write(json.dumps(meta).encode()))
+    
+    def get_metadata(self, symbol: str, interval: str) -> Optional[Dict]:
+        """Get the sidecar metadata for a stored series, or None if not stored"""
+        try:
+            with open(self._meta_path(symbol, interval)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+    
+    def clear(self):
+        """Remove all stored series"""
+        for name in os.listdir(self.root_dir):
+            if name.endswith('.npy') or name.endswith('.json'):
+                try:
+                    os.remove(os.path.join(self.root_dir, name))
+                except OSError:
+                    pass
+    
+    def _atomic_write(self, path: str, write):
+        """Write to a temporary file next to path and move it into place"""
+        fd, tmp_path = tempfile.mkstemp(dir=self.root_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                write(f)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+    
+    def _base_name(self, symbol: str, interval: str) -> str:
+        """File name stem for a series; symbols like M&M.NS are percent-encoded"""
+        return f"{quote(symbol, safe='.-')}__{interval}"
+    
+    def _data_path(self, symbol: str, interval: str) -> str:
+        return os.path.join(self.root_dir, self._base_name(symbol, interval) + '.npy')
+    
+    def _meta_path(self, symbol: str, interval: str) -> str:
+        return os.path.join(self.root_dir, self._base_name(symbol, interval) + '.json')
@@ -0,0 +1,261 @@
+import math
+import numpy as np
+import pandas as pd
+from collections import deque
+from typing import Optional, Dict, Callable
+from breakout_detector import BreakoutDetector
+
+class RollingSum:
+    """Sum of the last `window` values, updated in O(1) per value with a ring buffer"""
+    
+    RESYNC_EVERY = 1000  # Re-add from scratch now and then so float error can't build up
+    
+    def __init__(self, window: int):
+        self.window = window
+        self.values = deque(maxlen=window)
+        self.total = 0.0
+        self._pushes = 0
+    
+    def push(self, value: float):
+        if len(self.values) == self.window:
+            self.total -= self.values[0]
+        self.values.append(value)
+        self.total += value
+        
+        self._pushes += 1
+        if self._pushes % self.RESYNC_EVERY == 0:
+            self.total = math.fsum(self.values)
+    
+    def __len__(self) -> int:
+        return len(self.values)
+
+class RollingExtreme:
+    """Max (or min) of the last `window` values via a monotonic deque, amortized O(1) per value"""
+    
+    def __init__(self, window: int, mode: str = 'max'):
+        self.window = window
+        self.mode = mode
+        self.count = 0
+        self._candidates = deque()  # (position, value), values strictly decreasing for max
+    
+    def push(self, value: float):
+        candidates = self._candidates
+        if self.mode == 'max':
+            while candidates and candidates[-1][1] <= value:
+                candidates.pop()
+        else:
+            while candidates and candidates[-1][1] >= value:
+                candidates.pop()
+        
+        candidates.append((self.count, value))
+        self.count += 1
+        
+        # Drop the front once it slides out of the window
+        if candidates[0][0] <= self.count - 1 - self.window:
+            candidates.popleft()
+    
+    @property
+    def value(self) -> float:
+        return self._candidates[0][1] if self._candidates else np.nan
+
+class BreakoutStream:
+    """
+    Streaming breakout indicators for one symbol
+    
+    Holds the completed bars' state in ring buffers and monotonic deques plus the
+    current (forming) bar. push_bar starts a new bar, update_bar revises the current one
+    from ticks; both are O(1). snapshot() yields the same values detect_breakouts reads
+    from its rolling columns, so BreakoutDetector.evaluate_snapshot can score it.
+    """
+    
+    def __init__(self):
+        self.closed_bars = 0
+        self.last_close = None  # Close of the last completed bar
+        self.ath = -np.inf  # Highest high of the completed bars
+        self.close_sum_19 = RollingSum(19)  # + current close = SMA_20
+        self.close_sum_20 = RollingSum(20)  # Previous bar's SMA_20
+        self.close_sum_49 = RollingSum(49)  # + current close = SMA_50
+        self.volume_sum_19 = RollingSum(19)  # + current volume = Volume_SMA
+        self.high_20 = RollingExtreme(20, 'max')  # Previous 20-bar high
+        self.low_20 = RollingExtreme(20, 'min')  # Previous 20-bar low
+        self.recent_highs = deque(maxlen=9)  # + current high = last 10 highs
+        self.current = None  # [high, low, close, volume] of the forming bar
+    
+    @classmethod
+    def from_history(cls, data: pd.DataFrame) -> 'BreakoutStream':
+        """
+        Warm up a stream from OHLCV history; the last row becomes the current bar
+        
+        Only the last 50 rows are replayed, older bars just contribute to the bar count
+        and all-time high.
+        """
+        stream = cls()
+        if data is None or data.empty:
+            return stream
+        
+        highs = data['High'].to_numpy(dtype=float)
+        lows = data['Low'].to_numpy(dtype=float)
+        closes = data['Close'].to_numpy(dtype=float)
+        volumes = data['Volume'].to_numpy(dtype=float)
+        
+        start = max(0, len(data) - 51)
+        if start:
+            stream.closed_bars = start
+            stream.ath = np.fmax.reduce(highs[:start])
+        
+        for i in range(start, len(data)):
+            stream.push_bar(highs[i], lows[i], closes[i], volumes[i])
+        
+        return stream
+    
+    def push_bar(self, high: float, low: float, close: float, volume: float):
+        """Complete the current bar and start a new one"""
+        if self.current is not None:
+            self._close_current()
+        self.current = [high, low, close, volume]
+    
+    def update_bar(self, high: Optional[float] = None, low: Optional[float] = None,
+                   close: Optional[float] = None, volume: Optional[float] = None):
+        """Revise the current bar in place (fields left as None keep their value)"""
+        if self.current is None:
+            self.current = [high, low, close, volume]
+            return
+        
+        for i, value in enumerate((high, low, close, volume)):
+            if value is not None:
+                self.current[i] = value
+    
+    def update_tick(self, price: float, volume: Optional[float] = None):
+        """
+        Fold a trade into the current bar
+        
+        Args:
+            price: Last traded price
+            volume: Cumulative volume of the current bar, if known
+        """
+        if self.current is None:
+            self.current = [price, price, price, volume or 0.0]
+            return
+        
+        high, low, _, current_volume = self.current
+        self.current = [max(high, price), min(low, price), price,
+                        current_volume if volume is None else volume]
+    
+    @property
+    def bars(self) -> int:
+        return self.closed_bars + (self.current is not None)
+    
+    def snapshot(self) -> Dict:
+        """Indicator values for the current bar, in BreakoutDetector._indicator_snapshot form"""
+        high, low, close, volume = self.current
+        bars = self.bars
+        closed = self.closed_bars
+        
+        return {
+            'bars': bars,
+            'close': close,
+            'high': high,
+            'volume': volume,
+            'prev_close': self.last_close if self.last_close is not None else close,
+            'avg_volume': (self.volume_sum_19.total + volume) / 20 if bars >= 20 else np.nan,
+            'resistance': self.high_20.value if closed >= 20 else np.nan,
+            'support': self.low_20.value if closed >= 20 else np.nan,
+            'sma_20': (self.close_sum_19.total + close) / 20 if bars >= 20 else np.nan,
+            'sma_50': (self.close_sum_49.total + close) / 50 if bars >= 50 else np.nan,
+            'prev_sma_20': self.close_sum_20.total / 20 if closed >= 20 else np.nan,
+            'ath': max(self.ath, high),
+            'recent_highs': list(self.recent_highs) + [high]
+        }
+    
+    def _close_current(self):
+        high, low, close, volume = self.current
+        self.closed_bars += 1
+        self.last_close = close
+        self.ath = max(self.ath, high)
+        self.close_sum_19.push(close)
+        self.close_sum_20.push(close)
+        self.close_sum_49.push(close)
+        self.volume_sum_19.push(volume)
+        self.high_20.push(high)
+        self.low_20.push(low)
+        self.recent_highs.append(high)
+
+class StreamingBreakoutDetector:
+    """
+    Breakout engine for live bar/tick feeds across many symbols
+    
+    Each symbol keeps a BreakoutStream, so a new bar or tick costs O(1) instead of a
+    rolling recompute over the symbol's whole history. Breakouts are scored with the
+    same rules as BreakoutDetector.detect_breakouts; a breakout event is emitted (and
+    passed to on_breakout) when a symbol's current bar first shows a breakout of a given
+    type with at least min_confirmation strength.
+    """
+    
+    def __init__(self, detector: Optional[BreakoutDetector] = None, timeframe: str = '1d',
+                 min_confirmation: int = 30, on_breakout: Optional[Callable[[Dict], None]] = None):
+        self.detector = detector or BreakoutDetector()
+        self.timeframe = timeframe
+        self.min_confirmation = min_confirmation
+        self.on_breakout = on_breakout
+        self.streams: Dict[str, BreakoutStream] = {}
+        self._emitted: Dict[str, set] = {}  # Breakout types already emitted for each symbol's current bar
+    
+    def seed(self, symbol: str, data: pd.DataFrame):
+        """Load history for a symbol; its last row becomes the current bar"""
+        self.streams[symbol] = BreakoutStream.from_history(data)
+        self._emitted[symbol] = set()
+    
+    def on_bar(self, symbol: str, high: float, low: float, close: float, volume: float) -> Optional[Dict]:
+        """
+        Start a new bar for a symbol
+        
+        Returns:
+            Breakout event dictionary, or None
+        """
+        stream = self.streams.setdefault(symbol, BreakoutStream())
+        stream.push_bar(high, low, close, volume)
+        self._emitted[symbol] = set()
+        return self._check(symbol)
+    
+    def on_tick(self, symbol: str, price: float, volume: Optional[float] = None) -> Optional[Dict]:
+        """
+        Fold a trade into a symbol's current bar
+        
+        Args:
+            symbol: Stock symbol
+            price: Last traded price
+            volume: Cumulative volume of the current bar, if known
+        
+        Returns:
+            Breakout event dictionary, or None
+        """
+        stream = self.streams.setdefault(symbol, BreakoutStream())
+        stream.update_tick(price, volume)
+        self._emitted.setdefault(symbol, set())
+        return self._check(symbol)
+    
+    def evaluate(self, symbol: str) -> Optional[Dict]:
+        """Current breakout information for a symbol (as detect_breakouts), or None"""
+        stream = self.streams.get(symbol)
+        if stream is None or stream.bars < self.detector.lookback_period:
+            return None
+        return self.detector.evaluate_snapshot(stream.snapshot(), self.timeframe)
+    
+    def _check(self, symbol: str) -> Optional[Dict]:
+        """Emit an event for a new breakout on the symbol's current bar"""
+        breakout_info = self.evaluate(symbol)
+        if not breakout_info or breakout_info['confirmation_strength'] < self.min_confirmation:
+            return None
+        
+        if breakout_info['type'] in self._emitted[symbol]:
+            return None
+        self._emitted[symbol].add(breakout_info['type'])
+        
+        event = {
+            'symbol': symbol,
+            'breakout_info': breakout_info,
+            'bar': self.streams[symbol].bars - 1
+        }
+        if self.on_breakout:
+            self.on_breakout(event)
+        return event
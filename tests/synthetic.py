@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+from typing import List, Optional, Tuple
+
+def make_ohlcv(n: int, seed: int = 0, freq: str = "D", volatility: float = 0.015,
+               decimals: Optional[int] = None, start: str = "2020-01-01") -> pd.DataFrame:
+    """
+    Deterministic random-walk OHLCV frame
+    
+    Args:
+        n: Number of bars
+        seed: Random seed; the same seed always gives the same frame
+        freq: Bar spacing of the DatetimeIndex
+        volatility: Standard deviation of the per-bar log return
+        decimals: Round prices to this many decimals, which produces tied highs/lows
+        start: First timestamp
+    """
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.standard_normal(n) * volatility))
+    open_ = close * (1 + rng.standard_normal(n) * volatility / 4)
+    high = np.maximum(open_, close) * (1 + np.abs(rng.standard_normal(n)) * volatility / 2)
+    low = np.minimum(open_, close) * (1 - np.abs(rng.standard_normal(n)) * volatility / 2)
+    volume = rng.integers(10_000, 1_000_000, n).astype(float)
+    
+    frame = pd.DataFrame({'Open': open_, 'High': high, 'Low': low, 'Close': close, 'Volume': volume},
+                         index=pd.date_range(start, periods=n, freq=freq))
+    if decimals is not None:
+        frame[['Open', 'High', 'Low', 'Close']] = frame[['Open', 'High', 'Low', 'Close']].round(decimals)
+    return frame
+
+def make_breakout_frames(count: int, seed: int = 0, n_range: Tuple[int, int] = (20, 300)) -> List[pd.DataFrame]:
+    """
+    Daily frames whose last bars are pushed to trigger each breakout type in turn
+    
+    Frames with k % 6 of 1 to 4 end in a resistance breakout, a support breakdown, a
+    volume spike and an all-time-high retest; the others are left as generated.
+    """
+    rng = np.random.default_rng(seed)
+    frames = []
+    for k in range(count):
+        frame = make_ohlcv(int(rng.integers(*n_range)), seed=int(rng.integers(2 ** 31)))
+        high, low, close, volume = (frame[column].to_numpy().copy() for column in ('High', 'Low', 'Close', 'Volume'))
+        
+        kind = k % 6
+        if kind == 1:
+            close[-1] *= 1.06
+            high[-1] = max(high[-1], close[-1] * 1.01)
+        elif kind == 2:
+            close[-1] *= 0.94
+            low[-1] = min(low[-1], close[-1] * 0.99)
+        elif kind == 3:
+            volume[-1] *= 3
+            close[-1] *= 1.035
+            high[-1] = max(high[-1], close[-1])
+        elif kind == 4:
+            top = high.max()
+            high[-5:] = top * (1 - rng.random(min(5, len(high))) * 0.01)
+            close[-1] = top * 0.99
+            volume[-1] *= 2
+        
+        frame['High'], frame['Low'], frame['Close'], frame['Volume'] = high, low, close, volume
+        frames.append(frame)
+    return frames
@@ -0,0 +1,68 @@
+"""
+Replay test for IncrementalZoneDetector
+
+A series is fed to the incremental detector one candle at a time, the way a live
+refresh sees it, including still-forming candles that change in place and revisions
+of recent bars. After every update its zones must equal a full detect_zones run on the
+same data.
+"""
+import numpy as np
+import pytest
+from zone_detector import ZoneDetector, IncrementalZoneDetector
+from synthetic import make_ohlcv
+
+HIGH, LOW = 1, 2  # Column positions in make_ohlcv frames
+
+def replay(data, timeframe, htf_zones=None, seed=0):
+    """Yield (frame passed to update, incremental zones) for a candle-by-candle replay"""
+    rng = np.random.default_rng(seed)
+    detector = IncrementalZoneDetector()
+    
+    for end in range(5, len(data) + 1):
+        visible = data.iloc[:end]
+        
+        if end > 6 and rng.random() < 0.5:
+            # The last candle while it is still forming: a narrower range than it closes with
+            forming = visible.copy()
+            forming.iloc[-1, HIGH] *= 0.995
+            forming.iloc[-1, LOW] *= 1.002
+            yield forming, detector.update(forming, timeframe, htf_zones)
+        
+        if end > 50 and rng.random() < 0.03:
+            # Provider revises the last few bars
+            revised = visible.copy()
+            revised.iloc[-8:, [HIGH, LOW]] *= 1.01
+            yield revised, detector.update(revised, timeframe, htf_zones)
+        
+        yield visible, detector.update(visible, timeframe, htf_zones)
+    
+    # A jump of several bars at once, then the whole history adjusted (e.g. a split)
+    yield data, detector.update(data, timeframe, htf_zones)
+    adjusted = data * 0.98
+    yield adjusted, detector.update(adjusted, timeframe, htf_zones)
+
+@pytest.mark.parametrize("seed, timeframe", [(0, "1d"), (1, "1h"), (2, "1wk"), (3, "1m")])
+def test_replay_matches_full_detection(seed, timeframe):
+    data = make_ohlcv(250, seed=seed, volatility=0.02)
+    full = ZoneDetector()
+    
+    for frame, zones in replay(data, timeframe, seed=seed):
+        assert zones == full.detect_zones(frame, timeframe)
+
+def test_replay_with_htf_zones_matches_full_detection():
+    data = make_ohlcv(250, seed=4, volatility=0.02)
+    htf_zones = [{'type': 'demand', 'level': float(data['Low'].iloc[50])},
+                 {'type': 'supply', 'level': float(data['High'].iloc[80])}]
+    full = ZoneDetector()
+    
+    for frame, zones in replay(data, "1d", htf_zones, seed=4):
+        assert zones == full.detect_zones(frame, "1d", htf_zones)
+
+def test_replay_past_max_replay_matches_full_detection():
+    # Gaps longer than max_replay bars fall back to a rebuild
+    data = make_ohlcv(400, seed=5, volatility=0.02)
+    detector = IncrementalZoneDetector(max_replay=16)
+    full = ZoneDetector()
+    
+    for end in (40, 41, 120, 121, 400):
+        assert detector.update(data.iloc[:end]) == full.detect_zones(data.iloc[:end])
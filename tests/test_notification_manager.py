@@ -0,0 +1,118 @@
+"""
+NotificationManager against a throwaway SMTP server on a local socket (the stdlib smtpd
+module is gone in Python 3.12): delivery, the pooled background sender, and close()
+leaving a working manager behind even when the sender is stuck mid-send.
+"""
+import socket
+import threading
+from email import message_from_string, policy
+import pytest
+
+pytest.importorskip("streamlit")
+from notification_manager import NotificationManager
+
+ZONE = {'type': 'demand', 'level': 150.0, 'strength': 'strong', 'touches': 3}
+
+class LocalSMTPServer:
+    """Minimal SMTP responder: accepts every message and keeps its raw DATA"""
+    
+    def __init__(self):
+        self.messages = []
+        self.connections = 0
+        self.gate = threading.Event()  # Cleared to hold the reply to DATA
+        self.gate.set()
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._sock.bind(('127.0.0.1', 0))
+        self._sock.listen()
+        self.port = self._sock.getsockname()[1]
+        threading.Thread(target=self._accept, daemon=True).start()
+    
+    def close(self):
+        self.gate.set()
+        self._sock.close()
+    
+    def _accept(self):
+        while True:
+            try:
+                conn, _ = self._sock.accept()
+            except OSError:
+                return
+            self.connections += 1
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+    
+    def _serve(self, conn):
+        with conn, conn.makefile('rb') as reader:
+            conn.sendall(b"220 localhost ESMTP\r\n")
+            for line in reader:
+                command = line.strip().upper()
+                if command.startswith((b"EHLO", b"HELO")):
+                    conn.sendall(b"250-localhost\r\n250 OK\r\n")
+                elif command == b"DATA":
+                    conn.sendall(b"354 End data with <CR><LF>.<CR><LF>\r\n")
+                    data = b"".join(iter(reader.readline, b".\r\n"))
+                    self.gate.wait()
+                    self.messages.append(data.decode())
+                    conn.sendall(b"250 OK\r\n")
+                elif command == b"QUIT":
+                    conn.sendall(b"221 Bye\r\n")
+                    return
+                else:
+                    conn.sendall(b"250 OK\r\n")
+
+@pytest.fixture
+def server(monkeypatch):
+    monkeypatch.setenv("SMTP_PASSWORD", "")  # No login on the local server
+    server = LocalSMTPServer()
+    yield server
+    server.close()
+
+def make_manager(server, **kwargs):
+    manager = NotificationManager("127.0.0.1", server.port, use_tls=False, **kwargs)
+    manager.set_email("trader@example.com")
+    return manager
+
+def test_synchronous_send(server):
+    manager = make_manager(server, background=False)
+    assert manager.send_alert("Price near demand zone", "TEST", ZONE, 151.0)
+    manager.close()
+    
+    assert len(server.messages) == 1
+    msg = message_from_string(server.messages[0], policy=policy.default)
+    assert msg['Subject'].endswith("Zone Alert: TEST - Demand Zone")
+    assert msg['To'] == "trader@example.com"
+    stats = manager.get_send_stats()
+    assert (stats['sent'], stats['failed'], stats['connects']) == (1, 0, 1)
+
+def test_background_sender_reuses_one_connection(server):
+    manager = make_manager(server)
+    for i in range(5):
+        assert manager.send_alert(f"Alert {i}", f"SYM{i}", ZONE, 151.0)
+    assert manager.flush(timeout=5)
+    manager.close()
+    
+    assert len(server.messages) == 5
+    assert server.connections == 1
+    assert manager.get_send_stats()['sent'] == 5
+    assert manager._worker is None
+
+def test_close_with_stuck_sender_leaves_manager_usable(server):
+    manager = make_manager(server)
+    server.gate.clear()
+    assert manager.send_alert("Held", "HELD", ZONE, 151.0)
+    stuck = manager._worker
+    
+    manager.close(timeout=0.2)
+    assert stuck.is_alive()
+    assert manager._worker is None
+    assert manager._queue.qsize() == 0  # No leftover wake-up sentinel
+    
+    assert manager.send_alert("After close", "NEXT", ZONE, 151.0)
+    assert manager._worker is not stuck
+    server.gate.set()
+    assert manager.flush(timeout=5)
+    stuck.join(5)
+    assert not stuck.is_alive()
+    manager.close()
+    
+    assert len(server.messages) == 2
+    assert manager.get_send_stats()['sent'] == 2
@@ -0,0 +1,21 @@
+import pytest
+from zone_detector import ZoneDetector
+from synthetic import make_ohlcv
+
+# Rounded prices give tied highs/lows, where the strict/non-strict comparisons matter
+@pytest.mark.parametrize("n", [0, 1, 5, 11, 12, 50, 1000, 20000])
+@pytest.mark.parametrize("decimals", [None, 1])
+def test_vectorized_pivots_match_loops(n, decimals):
+    data = make_ohlcv(n, seed=n, decimals=decimals)
+    loop, vectorized = ZoneDetector(vectorized_pivots=False), ZoneDetector()
+    
+    for window in (1, 2, 3, 5, 6):
+        assert vectorized._find_pivot_highs(data, window) == loop._find_pivot_highs(data, window)
+        assert vectorized._find_pivot_lows(data, window) == loop._find_pivot_lows(data, window)
+
+@pytest.mark.parametrize("timeframe", ["1m", "1h", "1d", "1wk"])
+def test_detect_zones_unchanged_by_pivot_engine(timeframe):
+    data = make_ohlcv(600, seed=3, volatility=0.03, decimals=1)
+    
+    assert ZoneDetector().detect_zones(data, timeframe) == \
+        ZoneDetector(vectorized_pivots=False).detect_zones(data, timeframe)
@@ -0,0 +1,66 @@
+"""
+BreakoutDetector(tail_only=True) must return exactly what the default full-frame
+detect_breakouts returns: same breakout (or None), same type, and the same numbers up
+to float rounding of the shorter rolling windows.
+"""
+import numpy as np
+import pytest
+from breakout_detector import BreakoutDetector
+from synthetic import make_breakout_frames
+
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close']
+
+def assert_same_breakout(tail, full):
+    if full is None:
+        assert tail is None
+        return
+    
+    assert tail is not None and tail.keys() == full.keys()
+    for key, value in full.items():
+        if isinstance(value, (str, int, bool)):
+            assert tail[key] == value, key
+        else:
+            assert np.isclose(tail[key], value, rtol=1e-12, atol=0), key
+
+@pytest.fixture(scope="module")
+def frames():
+    return make_breakout_frames(600, seed=21, n_range=(20, 1300))
+
+def test_tail_only_matches_full_frame(frames):
+    full, tail = BreakoutDetector(), BreakoutDetector(tail_only=True)
+    breakout_types = set()
+    
+    for frame in frames:
+        expected = full.detect_breakouts(frame)
+        assert_same_breakout(tail.detect_breakouts(frame), expected)
+        if expected:
+            breakout_types.add(expected['type'])
+    
+    # The synthetic frames reach every breakout branch
+    assert {'resistance_breakout', 'support_breakdown', 'volume_breakout', 'ath_breakout'} <= breakout_types
+
+def test_tail_only_matches_full_frame_on_compact_frames(frames):
+    full, tail = BreakoutDetector(), BreakoutDetector(tail_only=True)
+    
+    for frame in frames[:200]:
+        compact = frame.astype({column: np.float32 for column in PRICE_COLUMNS})
+        assert_same_breakout(tail.detect_breakouts(compact), full.detect_breakouts(compact))
+
+def test_running_ath_cache_follows_growing_and_adjusted_series():
+    frame = make_breakout_frames(5, seed=4, n_range=(1300, 1301))[4]
+    full, tail = BreakoutDetector(), BreakoutDetector(tail_only=True)
+    
+    # Appended bars extend the cached running maximum
+    for end in range(1000, 1300):
+        assert_same_breakout(tail.detect_breakouts(frame.iloc[:end]), full.detect_breakouts(frame.iloc[:end]))
+    
+    # A rescaled history (e.g. split adjustment) invalidates it
+    adjusted = frame.copy()
+    adjusted[PRICE_COLUMNS] *= 0.97
+    assert_same_breakout(tail.detect_breakouts(adjusted), full.detect_breakouts(adjusted))
+
+def test_short_series_return_none():
+    frame = make_breakout_frames(1, seed=1, n_range=(20, 21))[0]
+    
+    assert BreakoutDetector(tail_only=True).detect_breakouts(frame.iloc[:10]) is None
+    assert BreakoutDetector(tail_only=True).detect_breakouts(None) is None
@@ -0,0 +1,38 @@
+"""
+Regression test for the vectorized tested-zone scanner
+
+tests/fixtures/zone_regression.json was recorded with the per-bar loop implementation
+of _identify_tested_zones_with_reactions (and the detect_zones built on it) before it
+was vectorized. Each case holds its input bars, so the fixtures don't depend on the
+random generator, and the loop's output for them.
+"""
+import json
+import os
+import pandas as pd
+import pytest
+from zone_detector import ZoneDetector
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "zone_regression.json")
+
+with open(FIXTURES) as f:
+    CASES = json.load(f)['cases']
+
+def load_bars(case) -> pd.DataFrame:
+    bars = case['bars']
+    return pd.DataFrame(bars, index=pd.date_range(case['start'], periods=len(bars['Close']), freq=case['freq']))
+
+def as_recorded(zones):
+    """Zones as plain Python values, the way the fixtures store them"""
+    return json.loads(json.dumps(zones, default=lambda value: value.item()))
+
+@pytest.mark.parametrize("case", CASES, ids=[case['name'] for case in CASES])
+def test_tested_zones_match_recorded(case):
+    zones = ZoneDetector()._identify_tested_zones_with_reactions(load_bars(case))
+    
+    assert as_recorded(zones) == case['tested_zones']
+
+@pytest.mark.parametrize("case", CASES, ids=[case['name'] for case in CASES])
+def test_detect_zones_match_recorded(case):
+    zones = ZoneDetector().detect_zones(load_bars(case), case['timeframe'])
+    
+    assert as_recorded(zones) == case['zones']
@@ -1,17 +1,27 @@
+import copy
+import heapq
+import threading
 import pandas as pd
 import numpy as np
-from typing import List, Dict, Tuple
+from collections import OrderedDict
+from typing import List, Dict, Tuple, Optional
 
 class ZoneDetector:
     """
     Detects demand and supply zones in stock price data using support/resistance analysis
     """
     
-    def __init__(self, min_touches: int = 1, zone_strength_period: int = 20):
+    ZONE_CACHE_SIZE = 128
+    
+    def __init__(self, min_touches: int = 1, zone_strength_period: int = 20, vectorized_pivots: bool = True):
         self.min_touches = min_touches  # Reduced to catch fresh zones
         self.zone_strength_period = zone_strength_period
+        self.vectorized_pivots = vectorized_pivots  # NumPy sliding-window pivots instead of per-bar loops
+        self._zone_cache = OrderedDict()  # Detected zones per data fingerprint, least recently used first
+        self._zone_cache_lock = threading.Lock()
     
-    def detect_zones(self, data: pd.DataFrame, timeframe: str = "1d", htf_zones: List[Dict] = None) -> List[Dict]:
+    def detect_zones(self, data: pd.DataFrame, timeframe: str = "1d", htf_zones: List[Dict] = None,
+                     symbol: Optional[str] = None) -> List[Dict]:
         """
         Main method to detect fresh, high-quality demand and supply zones
         
@@ -19,10 +29,61 @@ class ZoneDetector:
             data: DataFrame with OHLCV data
             timeframe: Timeframe string (e.g., "1d", "1wk", "1mo")
             htf_zones: Higher timeframe zones for confluence
+            symbol: Ticker the data belongs to; when given, results are memoized by a
+                fingerprint of the data, timeframe, detector settings and HTF zones, so
+                a repeat call on unchanged data skips detection
             
         Returns:
             List of zone dictionaries with type, level, strength, and other properties
         """
+        cache_key = self._zone_cache_key(symbol, data, timeframe, htf_zones) if symbol is not None else None
+        if cache_key is not None:
+            with self._zone_cache_lock:
+                cached = self._zone_cache.get(cache_key)
+                if cached is not None:
+                    self._zone_cache.move_to_end(cache_key)
+            if cached is not None:
+                return copy.deepcopy(cached)  # Callers annotate and extend the zones they get
+        
+        zones = self._detect_zones(data, timeframe, htf_zones)
+        
+        if cache_key is not None:
+            with self._zone_cache_lock:
+                self._zone_cache[cache_key] = copy.deepcopy(zones)
+                while len(self._zone_cache) > self.ZONE_CACHE_SIZE:
+                    self._zone_cache.popitem(last=False)
+        
+        return zones
+    
+    def clear_cache(self, symbol: Optional[str] = None):
+        """Forget all memoized zones, or only those of symbol"""
+        with self._zone_cache_lock:
+            if symbol is None:
+                self._zone_cache.clear()
+                return
+            for key in [key for key in self._zone_cache if key[0] == symbol]:
+                del self._zone_cache[key]
+    
+    def _zone_cache_key(self, symbol: str, data: pd.DataFrame, timeframe: str, htf_zones: List[Dict] = None):
+        """
+        Memo key for a detect_zones call, or None if data can't be fingerprinted
+        
+        Besides the series bounds and length, the key holds the last bar's values so a
+        still-forming candle that changes in place is detected again.
+        """
+        if data is None or data.empty:
+            return None
+        
+        last_bar = tuple(float(data[column].iat[-1]) for column in ('Open', 'High', 'Low', 'Close', 'Volume')
+                         if column in data.columns)
+        # Confluence only looks at HTF zone type and level
+        htf_fingerprint = tuple((zone['type'], float(zone['level'])) for zone in htf_zones) if htf_zones else ()
+        params = (type(self).__name__, self.min_touches, self.zone_strength_period, self.vectorized_pivots)
+        
+        return (symbol, timeframe, len(data), data.index[0], data.index[-1], last_bar, params, htf_fingerprint)
+    
+    def _detect_zones(self, data: pd.DataFrame, timeframe: str = "1d", htf_zones: List[Dict] = None) -> List[Dict]:
+        """Run the full detection (detect_zones without the memo cache)"""
         zones = []
         
         # Adjust window size based on timeframe
@@ -32,17 +93,27 @@ class ZoneDetector:
         pivot_highs = self._find_pivot_highs(data, window_size)
         pivot_lows = self._find_pivot_lows(data, window_size)
         
+        # Precompute future price extremes once so each freshness check is a lookup
+        freshness_index = self._build_freshness_index(data)
+        
+        # Precompute reaction strength of every bar in one batched pass
+        reaction_index = self._build_reaction_index(data)
+        
         # Identify fresh zones with strong price reactions
-        fresh_supply_zones = self._identify_fresh_supply_zones(data, pivot_highs)
+        fresh_supply_zones = self._identify_fresh_supply_zones(data, pivot_highs, freshness_index, reaction_index)
         zones.extend(fresh_supply_zones)
         
-        fresh_demand_zones = self._identify_fresh_demand_zones(data, pivot_lows)
+        fresh_demand_zones = self._identify_fresh_demand_zones(data, pivot_lows, freshness_index, reaction_index)
         zones.extend(fresh_demand_zones)
         
         # Add tested zones that showed strong reactions
-        tested_zones = self._identify_tested_zones_with_reactions(data)
+        tested_zones = self._identify_tested_zones_with_reactions(data, reaction_index)
         zones.extend(tested_zones)
         
+        return self._finalize_zones(zones, data, htf_zones)
+    
+    def _finalize_zones(self, zones: List[Dict], data: pd.DataFrame, htf_zones: List[Dict] = None) -> List[Dict]:
+        """Rank candidate zones, keep the best and score their strength and HTF confluence"""
         # Filter for quality and recency
         zones = self._filter_fresh_zones(zones, data)
         zones = self._calculate_enhanced_zone_strength(zones, data, htf_zones)
@@ -88,6 +159,9 @@ class ZoneDetector:
     
     def _find_pivot_highs(self, data: pd.DataFrame, window: int = 5) -> List[Tuple[int, float]]:
         """Find pivot high points in the data"""
+        if self.vectorized_pivots:
+            return self._find_pivots_vectorized(data['High'].to_numpy(dtype=float), window, 'high')
+        
         pivot_highs = []
         highs = data['High'].values
         
@@ -108,6 +182,9 @@ class ZoneDetector:
     
     def _find_pivot_lows(self, data: pd.DataFrame, window: int = 5) -> List[Tuple[int, float]]:
         """Find pivot low points in the data"""
+        if self.vectorized_pivots:
+            return self._find_pivots_vectorized(data['Low'].to_numpy(dtype=float), window, 'low')
+        
         pivot_lows = []
         lows = data['Low'].values
         
@@ -126,150 +203,279 @@ class ZoneDetector:
         
         return pivot_lows
     
-    def _identify_fresh_supply_zones(self, data: pd.DataFrame, pivot_highs: List[Tuple[int, float]]) -> List[Dict]:
+    def _find_pivots_vectorized(self, values: np.ndarray, window: int, pivot_type: str) -> List[Tuple[int, float]]:
+        """
+        Find pivot points by comparing every bar against its shifted neighbours at once
+        
+        Equivalent to the per-bar loops above: a bar is a pivot high only if no neighbour
+        within +/- window is >= it (<= it for pivot lows). Work is 2*window vectorized
+        comparisons over the whole series instead of a Python loop per bar.
+        
+        Args:
+            values: Highs or lows as a NumPy array
+            window: Number of bars on each side to compare against
+            pivot_type: 'high' or 'low'
+            
+        Returns:
+            List of (index, price) tuples, same as the loop-based finders
+        """
+        n = len(values)
+        if n < 2 * window + 1:
+            return []
+        
+        center = values[window:n - window]
+        is_pivot = np.ones(len(center), dtype=bool)
+        
+        for offset in range(-window, window + 1):
+            if offset == 0:
+                continue
+            neighbour = values[window + offset:n - window + offset]
+            # Negated comparison keeps the loop's NaN behaviour (NaN never disqualifies)
+            if pivot_type == 'high':
+                is_pivot &= ~(neighbour >= center)
+            else:
+                is_pivot &= ~(neighbour <= center)
+        
+        pivot_indices = np.flatnonzero(is_pivot) + window
+        return list(zip(pivot_indices.tolist(), values[pivot_indices]))
+    
+    def _identify_fresh_supply_zones(self, data: pd.DataFrame, pivot_highs: List[Tuple[int, float]],
+                                    freshness_index: Dict[str, np.ndarray] = None,
+                                    reaction_index: Dict[str, np.ndarray] = None) -> List[Dict]:
         """Identify fresh supply zones with strong bearish reactions"""
         zones = []
+        if freshness_index is None:
+            freshness_index = self._build_freshness_index(data)
+        if reaction_index is None:
+            reaction_index = self._build_reaction_index(data)
         
         for idx, high_price in pivot_highs:
             # Check if this is a fresh zone (price hasn't returned to this level)
-            if self._is_fresh_zone(data, idx, high_price, 'supply'):
+            if self._is_fresh_zone(data, idx, high_price, 'supply', freshness_index):
                 # Measure the bearish reaction strength
-                reaction_strength = self._measure_reaction_strength(data, idx, 'supply')
-                
-                if reaction_strength >= 3.0:  # Minimum 3% move required
-                    zone = {
-                        'type': 'supply',
-                        'level': high_price,
-                        'touches': 1,
-                        'latest_touch_index': idx,
-                        'pivot_indices': [idx],
-                        'strength': 'medium',
-                        'reaction_strength': reaction_strength,
-                        'is_fresh': True,
-                        'zone_quality': 'high' if reaction_strength >= 5.0 else 'medium'
-                    }
+                zone = self._build_fresh_zone('supply', idx, high_price, reaction_index['supply'][idx])
+                if zone:
                     zones.append(zone)
         
         return zones
     
-    def _identify_fresh_demand_zones(self, data: pd.DataFrame, pivot_lows: List[Tuple[int, float]]) -> List[Dict]:
+    def _identify_fresh_demand_zones(self, data: pd.DataFrame, pivot_lows: List[Tuple[int, float]],
+                                    freshness_index: Dict[str, np.ndarray] = None,
+                                    reaction_index: Dict[str, np.ndarray] = None) -> List[Dict]:
         """Identify fresh demand zones with strong bullish reactions"""
         zones = []
+        if freshness_index is None:
+            freshness_index = self._build_freshness_index(data)
+        if reaction_index is None:
+            reaction_index = self._build_reaction_index(data)
         
         for idx, low_price in pivot_lows:
             # Check if this is a fresh zone (price hasn't returned to this level)
-            if self._is_fresh_zone(data, idx, low_price, 'demand'):
+            if self._is_fresh_zone(data, idx, low_price, 'demand', freshness_index):
                 # Measure the bullish reaction strength
-                reaction_strength = self._measure_reaction_strength(data, idx, 'demand')
-                
-                if reaction_strength >= 3.0:  # Minimum 3% move required
-                    zone = {
-                        'type': 'demand',
-                        'level': low_price,
-                        'touches': 1,
-                        'latest_touch_index': idx,
-                        'pivot_indices': [idx],
-                        'strength': 'medium',
-                        'reaction_strength': reaction_strength,
-                        'is_fresh': True,
-                        'zone_quality': 'high' if reaction_strength >= 5.0 else 'medium'
-                    }
+                zone = self._build_fresh_zone('demand', idx, low_price, reaction_index['demand'][idx])
+                if zone:
                     zones.append(zone)
         
         return zones
     
-    def _identify_tested_zones_with_reactions(self, data: pd.DataFrame) -> List[Dict]:
-        """Identify zones that have been tested once but showed strong reactions"""
+    def _build_fresh_zone(self, zone_type: str, idx: int, level: float, reaction_strength: float) -> Dict:
+        """Zone dictionary for a fresh pivot, or None if its reaction is too weak"""
+        if reaction_strength < 3.0:  # Minimum 3% move required
+            return None
+        
+        return {
+            'type': zone_type,
+            'level': level,
+            'touches': 1,
+            'latest_touch_index': idx,
+            'pivot_indices': [idx],
+            'strength': 'medium',
+            'reaction_strength': reaction_strength,
+            'is_fresh': True,
+            'zone_quality': 'high' if reaction_strength >= 5.0 else 'medium'
+        }
+    
+    def _identify_tested_zones_with_reactions(self, data: pd.DataFrame,
+                                              reaction_index: Dict[str, np.ndarray] = None,
+                                              level_touches: Dict[str, np.ndarray] = None,
+                                              start: int = 10) -> List[Dict]:
+        """
+        Identify zones that have been tested once but showed strong reactions
+        
+        level_touches optionally holds precomputed touch counts for every bar
+        ({'demand': lows, 'supply': highs}, see _count_level_touches with stop=len(data)).
+        Bars before start are skipped.
+        """
         zones = []
-        highs = data['High'].values
-        lows = data['Low'].values
+        if reaction_index is None:
+            reaction_index = self._build_reaction_index(data)
         
         # Look for levels that were tested 2-3 times with strong reactions
-        for i in range(10, len(data) - 10):  # Skip recent and very old data
-            # Check for demand zone (low that was tested)
-            current_low = lows[i]
-            
-            # Count how many times this level was tested
-            touches = 0
-            for j in range(i + 1, min(i + 20, len(data))):
-                if abs(lows[j] - current_low) / current_low <= 0.02:  # Within 2%
-                    touches += 1
-            
-            # If tested 1-2 times, check reaction strength
-            if 1 <= touches <= 2:
-                reaction_strength = self._measure_reaction_strength(data, i, 'demand')
-                if reaction_strength >= 4.0:  # Strong reaction required for tested zones
-                    zone = {
-                        'type': 'demand',
-                        'level': current_low,
-                        'touches': touches + 1,
-                        'latest_touch_index': i,
-                        'pivot_indices': [i],
-                        'strength': 'medium',
-                        'reaction_strength': reaction_strength,
-                        'is_fresh': False,
-                        'zone_quality': 'high' if reaction_strength >= 6.0 else 'medium'
-                    }
-                    zones.append(zone)
-            
-            # Check for supply zone (high that was tested)
-            current_high = highs[i]
-            touches = 0
-            for j in range(i + 1, min(i + 20, len(data))):
-                if abs(highs[j] - current_high) / current_high <= 0.02:  # Within 2%
-                    touches += 1
-            
-            if 1 <= touches <= 2:
-                reaction_strength = self._measure_reaction_strength(data, i, 'supply')
-                if reaction_strength >= 4.0:
-                    zone = {
-                        'type': 'supply',
-                        'level': current_high,
-                        'touches': touches + 1,
-                        'latest_touch_index': i,
-                        'pivot_indices': [i],
-                        'strength': 'medium',
-                        'reaction_strength': reaction_strength,
-                        'is_fresh': False,
-                        'zone_quality': 'high' if reaction_strength >= 6.0 else 'medium'
-                    }
-                    zones.append(zone)
+        stop = len(data) - 10  # Skip recent and very old data
+        if stop <= start:
+            return zones
+        
+        # Count how many times each level was tested
+        if level_touches is None:
+            demand_touches = self._count_level_touches(data['Low'].to_numpy(dtype=float), start, stop)
+            supply_touches = self._count_level_touches(data['High'].to_numpy(dtype=float), start, stop)
+        else:
+            demand_touches = level_touches['demand'][start:stop]
+            supply_touches = level_touches['supply'][start:stop]
+        
+        # If tested 1-2 times, check reaction strength (strong reaction required for tested zones)
+        demand_hits = np.flatnonzero((demand_touches >= 1) & (demand_touches <= 2) &
+                                     (reaction_index['demand'][start:stop] >= 4.0)) + start
+        supply_hits = np.flatnonzero((supply_touches >= 1) & (supply_touches <= 2) &
+                                     (reaction_index['supply'][start:stop] >= 4.0)) + start
+        
+        # Emit bar by bar, demand before supply, so ordering matches a sequential scan
+        candidates = sorted([(i, 'demand') for i in demand_hits.tolist()] +
+                            [(i, 'supply') for i in supply_hits.tolist()],
+                            key=lambda c: (c[0], c[1] == 'supply'))
+        
+        lows = data['Low'].to_numpy(dtype=float)
+        highs = data['High'].to_numpy(dtype=float)
+        for i, zone_type in candidates:
+            touches = demand_touches[i - start] if zone_type == 'demand' else supply_touches[i - start]
+            reaction_strength = reaction_index[zone_type][i]
+            zone = {
+                'type': zone_type,
+                'level': lows[i] if zone_type == 'demand' else highs[i],
+                'touches': int(touches) + 1,
+                'latest_touch_index': i,
+                'pivot_indices': [i],
+                'strength': 'medium',
+                'reaction_strength': reaction_strength,
+                'is_fresh': False,
+                'zone_quality': 'high' if reaction_strength >= 6.0 else 'medium'
+            }
+            zones.append(zone)
         
         return zones
     
-    def _is_fresh_zone(self, data: pd.DataFrame, pivot_idx: int, pivot_price: float, zone_type: str) -> bool:
+    def _count_level_touches(self, prices: np.ndarray, start: int, stop: int, lookahead: int = 20,
+                             tolerance: float = 0.02) -> np.ndarray:
+        """
+        Count, for each bar in [start, stop), how many of the following bars came within tolerance
+        
+        Banded comparison: one vectorized pass per offset in 1..lookahead-1 instead of a
+        Python loop per bar and offset.
+        
+        Returns:
+            Array of touch counts aligned with bars start..stop-1
+        """
+        n = len(prices)
+        base = prices[start:stop]
+        touches = np.zeros(len(base), dtype=int)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for offset in range(1, lookahead):
+                neighbour = prices[start + offset:min(stop + offset, n)]
+                if len(neighbour) == 0:
+                    break
+                current = base[:len(neighbour)]
+                touches[:len(neighbour)] += np.abs(neighbour - current) / current <= tolerance  # Within 2%
+        
+        return touches
+    
+    def _build_freshness_index(self, data: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """
+        Build suffix extrema used to answer freshness checks in O(1)
+        
+        Args:
+            data: DataFrame with OHLCV data
+            
+        Returns:
+            Dictionary with 'future_min_low' and 'future_max_high' arrays where entry i
+            is the lowest low / highest high of all bars after i (+/-inf for the last bar)
+        """
+        lows = data['Low'].to_numpy(dtype=float)
+        highs = data['High'].to_numpy(dtype=float)
+        
+        future_min_low = np.full(len(lows), np.inf)
+        future_max_high = np.full(len(highs), -np.inf)
+        
+        if len(lows) > 1:
+            # fmin/fmax skip NaN, matching any() over pandas comparisons
+            future_min_low[:-1] = np.fmin.accumulate(lows[:0:-1])[::-1]
+            future_max_high[:-1] = np.fmax.accumulate(highs[:0:-1])[::-1]
+        
+        return {'future_min_low': future_min_low, 'future_max_high': future_max_high}
+    
+    def _is_fresh_zone(self, data: pd.DataFrame, pivot_idx: int, pivot_price: float, zone_type: str,
+                       freshness_index: Dict[str, np.ndarray] = None) -> bool:
         """Check if a zone is fresh (price hasn't returned to this level)"""
-        # Look at data after the pivot point
-        future_data = data.iloc[pivot_idx + 1:]
+        if freshness_index is None:
+            freshness_index = self._build_freshness_index(data)
         
         if zone_type == 'demand':
             # For demand zones, check if price came back to this low level
-            return not any(future_data['Low'] <= pivot_price * 1.01)  # 1% tolerance
+            return not freshness_index['future_min_low'][pivot_idx] <= pivot_price * 1.01  # 1% tolerance
         else:  # supply
             # For supply zones, check if price came back to this high level
-            return not any(future_data['High'] >= pivot_price * 0.99)  # 1% tolerance
+            return not freshness_index['future_max_high'][pivot_idx] >= pivot_price * 0.99  # 1% tolerance
     
     def _measure_reaction_strength(self, data: pd.DataFrame, pivot_idx: int, zone_type: str) -> float:
         """Measure the strength of price reaction from a zone"""
-        if pivot_idx >= len(data) - 5:
-            return 0.0
-        
-        pivot_price = data.iloc[pivot_idx]['High'] if zone_type == 'supply' else data.iloc[pivot_idx]['Low']
-        
-        # Look at next 5-10 candles for reaction
-        reaction_candles = min(10, len(data) - pivot_idx - 1)
-        future_data = data.iloc[pivot_idx + 1:pivot_idx + 1 + reaction_candles]
+        return float(self._measure_reaction_strengths(data, [pivot_idx], zone_type)[0])
+    
+    def _measure_reaction_strengths(self, data: pd.DataFrame, indices, zone_type: str) -> np.ndarray:
+        """
+        Measure price reaction strength for many candidate bars at once
         
-        if zone_type == 'demand':
-            # For demand zones, measure upward movement
-            max_high = future_data['High'].max()
-            reaction_pct = ((max_high - pivot_price) / pivot_price) * 100
-        else:  # supply
-            # For supply zones, measure downward movement
-            min_low = future_data['Low'].min()
-            reaction_pct = ((pivot_price - min_low) / pivot_price) * 100
+        Works on the raw High/Low arrays: the reaction of bar i is the largest move over
+        the next 10 candles (fewer near the end of the series), in percent of the bar's
+        low (demand) or high (supply). Bars with fewer than 5 candles after them score 0.
         
-        return max(0.0, reaction_pct)
+        Args:
+            data: DataFrame with OHLCV data
+            indices: Positional indices of the candidate bars
+            zone_type: 'demand' or 'supply'
+            
+        Returns:
+            Array of reaction percentages aligned with indices
+        """
+        indices = np.asarray(indices, dtype=int)
+        highs = data['High'].to_numpy(dtype=float)
+        lows = data['Low'].to_numpy(dtype=float)
+        n = len(data)
+        
+        reactions = np.zeros(len(indices))
+        valid = indices < n - 5
+        if n == 0 or not valid.any():
+            return reactions
+        candidates = indices[valid]
+        
+        # Window i of the padded series covers bars i+1..i+10; NaN padding is skipped by fmax/fmin
+        reaction_candles = 10
+        padding = np.full(reaction_candles, np.nan)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if zone_type == 'demand':
+                # For demand zones, measure upward movement
+                windows = np.lib.stride_tricks.sliding_window_view(np.concatenate([highs[1:], padding]), reaction_candles)
+                max_high = np.fmax.reduce(windows[candidates], axis=1)
+                pivot_price = lows[candidates]
+                reaction_pct = ((max_high - pivot_price) / pivot_price) * 100
+            else:  # supply
+                # For supply zones, measure downward movement
+                windows = np.lib.stride_tricks.sliding_window_view(np.concatenate([lows[1:], padding]), reaction_candles)
+                min_low = np.fmin.reduce(windows[candidates], axis=1)
+                pivot_price = highs[candidates]
+                reaction_pct = ((pivot_price - min_low) / pivot_price) * 100
+        
+        reactions[valid] = np.fmax(reaction_pct, 0.0)
+        return reactions
+    
+    def _build_reaction_index(self, data: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """Reaction strengths of every bar for both zone types, indexed by bar position"""
+        all_indices = np.arange(len(data))
+        return {
+            'demand': self._measure_reaction_strengths(data, all_indices, 'demand'),
+            'supply': self._measure_reaction_strengths(data, all_indices, 'supply')
+        }
     
     def _filter_fresh_zones(self, zones: List[Dict], data: pd.DataFrame) -> List[Dict]:
         """Filter zones to prioritize fresh zones with strong reactions"""
@@ -277,16 +483,20 @@ class ZoneDetector:
             return zones
         
         # Sort by quality and reaction strength
-        zones.sort(key=lambda z: (
-            z.get('zone_quality', 'low') == 'high',
-            z.get('reaction_strength', 0),
-            z.get('is_fresh', False),
-            -z['latest_touch_index']  # Negative for most recent first
-        ), reverse=True)
+        zones.sort(key=self._zone_rank_key, reverse=True)
         
         # Keep top quality zones
         return zones[:12]
     
+    def _zone_rank_key(self, zone: Dict) -> Tuple:
+        """Sort key for zone quality: high quality, reaction strength, freshness, then recency"""
+        return (
+            zone.get('zone_quality', 'low') == 'high',
+            zone.get('reaction_strength', 0),
+            zone.get('is_fresh', False),
+            -zone['latest_touch_index']  # Negative for most recent first
+        )
+    
     def _calculate_enhanced_zone_strength(self, zones: List[Dict], data: pd.DataFrame, htf_zones: List[Dict] = None) -> List[Dict]:
         """Enhanced strength calculation focusing on reaction quality"""
         for zone in zones:
@@ -579,3 +789,210 @@ class ZoneDetector:
             return 0
         except:
             return 0
+
+class IncrementalZoneDetector(ZoneDetector):
+    """
+    Stateful ZoneDetector that updates its zones as candles arrive instead of rescanning
+    
+    Keeps the confirmed pivots with the bar that first returned to each one (so freshness
+    can be rolled back), per-bar reaction strengths and level touch counts. On update only
+    the bars that are new or changed since the previous call are processed: pivots are
+    confirmed once `window` bars have passed, fresh zones are invalidated when price
+    returns, and the reaction/touch metrics still depending on those bars are recomputed.
+    The zones returned are the same as ZoneDetector.detect_zones on the full data.
+    
+    A changed window size (it depends on data length), a different timeframe or more
+    than max_replay new/changed bars fall back to a vectorized rebuild.
+    """
+    
+    def __init__(self, min_touches: int = 1, zone_strength_period: int = 20, max_replay: int = 64):
+        super().__init__(min_touches, zone_strength_period, vectorized_pivots=True)
+        self.max_replay = max_replay
+        self.reset()
+    
+    def reset(self):
+        """Forget all state; the next update rebuilds from scratch"""
+        self._timeframe = None
+        self._window = None
+        self._index = None
+        self._highs = np.empty(0)
+        self._lows = np.empty(0)
+        # Per zone type: [bar index, price, index of the bar that returned to it or None]
+        self._pivots = {'supply': [], 'demand': []}
+        self._reactions = {'supply': np.empty(0), 'demand': np.empty(0)}
+        self._touches = {'supply': np.empty(0, dtype=int), 'demand': np.empty(0, dtype=int)}
+        self._tested_zones = []  # Candidates before any changed bar's reach, kept between updates
+        self._volumes = None
+        self._volume_mean = None
+    
+    def detect_zones(self, data: pd.DataFrame, timeframe: str = "1d", htf_zones: List[Dict] = None,
+                     symbol: Optional[str] = None) -> List[Dict]:
+        """Incremental drop-in for ZoneDetector.detect_zones (see update); symbol is not used"""
+        return self.update(data, timeframe, htf_zones)
+    
+    def update(self, data: pd.DataFrame, timeframe: str = "1d", htf_zones: List[Dict] = None) -> List[Dict]:
+        """
+        Bring the zones up to date with the latest data
+        
+        Args:
+            data: Full DataFrame with OHLCV data, typically the previous data plus new
+                candles and/or a revised last (still forming) candle
+            timeframe: Timeframe string (e.g., "1d", "1wk", "1mo")
+            htf_zones: Higher timeframe zones for confluence
+            
+        Returns:
+            List of zone dictionaries, same as ZoneDetector.detect_zones
+        """
+        highs = data['High'].to_numpy(dtype=float)
+        lows = data['Low'].to_numpy(dtype=float)
+        n = len(data)
+        window = self._get_window_size_for_timeframe(timeframe, n)
+        
+        keep = self._unchanged_prefix(data.index, highs, lows)
+        if timeframe != self._timeframe or window != self._window or keep == 0 or n - keep > self.max_replay:
+            keep = 0
+            self._rebuild(data, highs, lows, timeframe, window)
+        else:
+            self._rewind(keep)
+            self._index, self._highs, self._lows = data.index, highs, lows
+            for j in range(keep, n):
+                self._append_bar(j)
+            self._refresh_metrics(data, keep)
+        
+        # Tested zones within touch-lookahead reach of a changed bar are rebuilt
+        tested_start = max(10, keep - 20)
+        self._tested_zones = [zone for zone in self._tested_zones if zone['latest_touch_index'] < tested_start]
+        self._tested_zones.extend(
+            self._identify_tested_zones_with_reactions(data, self._reactions, self._touches, tested_start)
+        )
+        
+        return self._assemble_zones(data, htf_zones)
+    
+    def _unchanged_prefix(self, index: pd.Index, highs: np.ndarray, lows: np.ndarray) -> int:
+        """Number of leading bars whose timestamp, high and low match the previous update"""
+        if self._index is None:
+            return 0
+        
+        m = min(len(self._index), len(index))
+        same = ((self._index[:m] == index[:m]) & (self._highs[:m] == highs[:m]) &
+                (self._lows[:m] == lows[:m]))
+        return m if same.all() else int(np.argmin(same))
+    
+    def _rebuild(self, data: pd.DataFrame, highs: np.ndarray, lows: np.ndarray, timeframe: str, window: int):
+        """Recompute all state in vectorized passes over the full series"""
+        self._timeframe, self._window = timeframe, window
+        self._index, self._highs, self._lows = data.index, highs, lows
+        
+        self._pivots = {
+            'supply': [[idx, price, self._first_return(idx, price, 'supply')]
+                       for idx, price in self._find_pivots_vectorized(highs, window, 'high')],
+            'demand': [[idx, price, self._first_return(idx, price, 'demand')]
+                       for idx, price in self._find_pivots_vectorized(lows, window, 'low')]
+        }
+        self._reactions = {'supply': np.empty(0), 'demand': np.empty(0)}
+        self._touches = {'supply': np.empty(0, dtype=int), 'demand': np.empty(0, dtype=int)}
+        self._refresh_metrics(data, 0)
+    
+    def _rewind(self, keep: int):
+        """Drop state that depends on bars at or after position keep"""
+        for zone_type, pivots in self._pivots.items():
+            # A pivot is confirmed by the bar `window` bars after it
+            pivots[:] = [pivot for pivot in pivots if pivot[0] + self._window < keep]
+            for pivot in pivots:
+                if pivot[2] is not None and pivot[2] >= keep:
+                    pivot[2] = None
+    
+    def _append_bar(self, j: int):
+        """Process bar j: invalidate fresh zones it returns to and confirm the pivot it completes"""
+        for pivot in self._pivots['supply']:
+            if pivot[2] is None and self._highs[j] >= pivot[1] * 0.99:  # 1% tolerance
+                pivot[2] = j
+        for pivot in self._pivots['demand']:
+            if pivot[2] is None and self._lows[j] <= pivot[1] * 1.01:  # 1% tolerance
+                pivot[2] = j
+        
+        window = self._window
+        candidate = j - window
+        if candidate < window:
+            return
+        
+        neighbourhood = slice(candidate - window, j + 1)
+        if self._find_pivots_vectorized(self._highs[neighbourhood], window, 'high'):
+            price = self._highs[candidate]
+            self._pivots['supply'].append([candidate, price, self._first_return(candidate, price, 'supply')])
+        if self._find_pivots_vectorized(self._lows[neighbourhood], window, 'low'):
+            price = self._lows[candidate]
+            self._pivots['demand'].append([candidate, price, self._first_return(candidate, price, 'demand')])
+    
+    def _first_return(self, idx: int, price: float, zone_type: str):
+        """Index of the first bar after idx that came back to a zone's level, or None if still fresh"""
+        if zone_type == 'demand':
+            returned = np.flatnonzero(self._lows[idx + 1:] <= price * 1.01)
+        else:  # supply
+            returned = np.flatnonzero(self._highs[idx + 1:] >= price * 0.99)
+        
+        return idx + 1 + int(returned[0]) if len(returned) else None
+    
+    def _refresh_metrics(self, data: pd.DataFrame, keep: int):
+        """Recompute reaction strengths and touch counts of the bars that can see bars >= keep"""
+        n = len(self._highs)
+        
+        # Reactions look 10 bars ahead and touches 19; earlier bars are final
+        reaction_start = max(0, keep - 11)
+        tail = data.iloc[reaction_start:]
+        tail_indices = np.arange(len(tail))
+        for zone_type in ('supply', 'demand'):
+            self._reactions[zone_type] = np.concatenate([
+                self._reactions[zone_type][:reaction_start],
+                self._measure_reaction_strengths(tail, tail_indices, zone_type)
+            ])
+        
+        touch_start = max(0, keep - 20)
+        self._touches['demand'] = np.concatenate([
+            self._touches['demand'][:touch_start], self._count_level_touches(self._lows, touch_start, n)
+        ])
+        self._touches['supply'] = np.concatenate([
+            self._touches['supply'][:touch_start], self._count_level_touches(self._highs, touch_start, n)
+        ])
+    
+    def _assemble_zones(self, data: pd.DataFrame, htf_zones: List[Dict] = None) -> List[Dict]:
+        """Build zone dictionaries from the current state, as detect_zones would"""
+        zones = []
+        
+        for zone_type in ('supply', 'demand'):
+            for idx, price, returned_at in self._pivots[zone_type]:
+                if returned_at is None:
+                    zone = self._build_fresh_zone(zone_type, idx, price, self._reactions[zone_type][idx])
+                    if zone:
+                        zones.append(zone)
+        
+        zones.extend(self._tested_zones)
+        
+        if 'Volume' in data.columns:
+            self._volumes = data['Volume'].to_numpy()
+            self._volume_mean = data['Volume'].mean()
+        else:
+            self._volumes = self._volume_mean = None
+        
+        return self._finalize_zones(zones, data, htf_zones)
+    
+    def _filter_fresh_zones(self, zones: List[Dict], data: pd.DataFrame) -> List[Dict]:
+        """Top 12 zones as copies, so scoring doesn't modify the cached tested zones"""
+        # nlargest is equivalent to sort(reverse=True)[:12] without sorting every candidate
+        best = heapq.nlargest(12, zones, key=self._zone_rank_key)
+        return [dict(zone, pivot_indices=list(zone['pivot_indices'])) for zone in best]
+    
+    def _calculate_volume_score(self, zone: Dict, data: pd.DataFrame) -> float:
+        """Volume score from the arrays captured for this update instead of per-zone pandas lookups"""
+        if self._volumes is None:
+            return super()._calculate_volume_score(zone, data)
+        
+        pivot_volumes = [self._volumes[idx] for idx in zone['pivot_indices'] if idx < len(self._volumes)]
+        if not pivot_volumes:
+            return 0
+        
+        # Volume ratio (max 25 points)
+        if self._volume_mean > 0:
+            return min(float(np.mean(pivot_volumes) / self._volume_mean * 25), 25.0)
+        
+        return 0
@@ -0,0 +1,99 @@
+import numpy as np
+from typing import Dict, List, Optional, Tuple, Iterable, Union
+
+class ZoneIndex:
+    """
+    Price-sorted zone levels per symbol for proximity queries
+    
+    set_zones sorts a symbol's zones by level once; query then finds every zone within
+    distance_pct percent of a price with two binary searches, O(log n + matches)
+    instead of a distance computation per zone. query_many answers a batch of
+    (symbol, price) pairs, e.g. one poll of a multi-symbol monitor.
+    """
+    
+    def __init__(self):
+        self._entries = {}  # symbol -> (sorted level array, zones in the same order)
+    
+    def set_zones(self, symbol: str, zones: List[Dict]):
+        """Replace a symbol's zones"""
+        levels = np.fromiter((zone['level'] for zone in zones), dtype=float, count=len(zones))
+        order = np.argsort(levels, kind='stable')
+        # Swap in one tuple so readers on other threads never see levels and zones out of step
+        self._entries[symbol] = (levels[order], [zones[i] for i in order])
+    
+    def remove(self, symbol: str):
+        self._entries.pop(symbol, None)
+    
+    def get_zones(self, symbol: str) -> List[Dict]:
+        """A symbol's zones in ascending level order"""
+        entry = self._entries.get(symbol)
+        return list(entry[1]) if entry else []
+    
+    def query(self, symbol: str, price: float, distance_pct: float) -> List[Tuple[Dict, float]]:
+        """
+        Zones of a symbol within distance_pct percent of price
+        
+        Returns:
+            List of (zone, distance %) in ascending level order, with the distance
+            computed as abs(level - price) / price * 100
+        """
+        entry = self._entries.get(symbol)
+        if not entry or not price:
+            return []
+        
+        levels, zones = entry
+        # Search a slightly wider band, then apply the exact test so boundary zones
+        # match the plain distance comparison
+        band = abs(price) * distance_pct / 100 * (1 + 1e-9)
+        lo = np.searchsorted(levels, price - band, side='left')
+        hi = np.searchsorted(levels, price + band, side='right')
+        if lo == hi:
+            return []
+        
+        distances = np.abs(levels[lo:hi] - price) / price * 100
+        return [(zones[lo + i], float(distances[i])) for i in np.flatnonzero(distances <= distance_pct)]
+    
+    def query_many(self, prices: Union[Dict[str, float], Iterable[Tuple[str, float]]],
+                   distance_pct: float) -> Dict[str, List[Tuple[Dict, float]]]:
+        """
+        Run query for many (symbol, price) pairs at once
+        
+        Args:
+            prices: Dictionary of symbol -> price, or iterable of (symbol, price) pairs
+            distance_pct: Proximity threshold in percent
+        
+        Returns:
+            Dictionary with symbol as key and its query result as value; symbols with no
+            zone in range are left out
+        """
+        pairs = prices.items() if isinstance(prices, dict) else prices
+        results = {}
+        for symbol, price in pairs:
+            matches = self.query(symbol, price, distance_pct)
+            if matches:
+                results[symbol] = matches
+        return results
+    
+    def nearest(self, symbol: str, price: float) -> Optional[Tuple[Dict, float]]:
+        """
+        The zone closest to price, by binary search
+        
+        Returns:
+            Tuple of (zone, distance %) or None if the symbol has no zones
+        """
+        entry = self._entries.get(symbol)
+        if not entry or not len(entry[0]) or not price:
+            return None
+        
+        levels, zones = entry
+        i = int(np.searchsorted(levels, price))
+        # Neighbours on either side of the insertion point; the lower one wins ties
+        candidates = [j for j in (i - 1, i) if 0 <= j < len(levels)]
+        best = min(candidates, key=lambda j: abs(levels[j] - price))
+        return zones[best], float(abs(levels[best] - price) / price * 100)
+    
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._entries
+    
+    def __len__(self) -> int:
+        return len(self._entries)
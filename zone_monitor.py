@@ -0,0 +1,348 @@
+import argparse
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Optional, Dict, List, Tuple, Callable
+from data_manager import DataManager
+from zone_detector import IncrementalZoneDetector
+from notification_manager import NotificationManager
+from alert_store import AlertStore
+from zone_index import ZoneIndex
+
+DEFAULT_SUBSCRIBER = "default"
+
+class ZoneMonitor:
+    """
+    Background monitor that checks watched symbols against their demand/supply zones
+    
+    A daemon thread polls every watched symbol on a fixed schedule: zones come from the
+    symbol's (period, timeframe) series through an IncrementalZoneDetector, the prices of
+    all watched symbols from one batched last-price request per poll. When the price is
+    within alert_distance percent of a zone an alert is recorded and emailed (once per
+    zone and recipient per cooldown, tracked in an AlertStore that also keeps the full
+    history). The dashboard, or the command line entry point below, only reads
+    get_status() and get_alerts().
+    
+    Every watch belongs to a subscriber (e.g. one dashboard session) with its own email
+    recipient, alert distance and digest window. A symbol watched by several subscribers
+    is polled once and each alert goes only to the subscribers it is within range of.
+    When subscriber_alive is given, watches of subscribers it reports gone are dropped
+    at the start of each poll.
+    """
+    
+    def __init__(self, data_manager: Optional[DataManager] = None,
+                 notification_manager: Optional[NotificationManager] = None,
+                 interval: float = 30.0, alert_distance: float = 1.0, cooldown_minutes: int = 30,
+                 max_alerts: int = 50, alert_store: Optional[AlertStore] = None,
+                 subscriber_alive: Optional[Callable[[str], bool]] = None):
+        self.data_manager = data_manager or DataManager()
+        self.notification_manager = notification_manager or NotificationManager()
+        self.interval = interval  # Seconds between polls
+        self.alert_distance = alert_distance  # Default alert distance (%) for watches that don't set one
+        self.cooldown = timedelta(minutes=cooldown_minutes)
+        self.max_alerts = max_alerts  # Recent alerts kept in memory per subscriber for get_alerts()
+        self.alert_store = alert_store or AlertStore(":memory:")  # Cooldowns and full alert history
+        self.subscriber_alive = subscriber_alive
+        self.last_poll = None
+        self.last_error = None  # Error of the last failed poll, cleared by the next successful one
+        self._watched = {}  # (symbol, timeframe, period) -> {subscriber: {'email': ..., 'alert_distance': ..., 'digest_window': ...}}
+        self._detectors = {}  # (symbol, timeframe, period) -> IncrementalZoneDetector
+        self._zone_index = ZoneIndex()  # Latest zones per (symbol, timeframe, period), sorted by level
+        self._status = {}  # (symbol, timeframe, period) -> latest result
+        self._alerts = {}  # subscriber -> recent alerts
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+    
+    def watch(self, symbol: str, timeframe: str = "1d", period: str = "1y", subscriber: str = DEFAULT_SUBSCRIBER,
+              email: Optional[str] = None, alert_distance: Optional[float] = None,
+              digest_window: Optional[float] = None):
+        """
+        Start (or update) a subscriber's watch on a symbol; zones are detected on (period, timeframe) data
+        
+        Args:
+            subscriber: Who the watch belongs to; alerts are kept and sent per subscriber
+            email: Where to mail the subscriber's alerts; None only records them
+            alert_distance: Alert when price is within this % of a zone; None uses the monitor's alert_distance
+            digest_window: Digest window (seconds) for the subscriber's emails; None uses the notification manager's
+        """
+        settings = self._subscription(email, alert_distance, digest_window)
+        with self._lock:
+            self._watched.setdefault((symbol, timeframe, period), {})[subscriber] = settings
+    
+    def subscribe(self, subscriber: str, symbols: List[str], timeframe: str = "1d", period: str = "1y",
+                  email: Optional[str] = None, alert_distance: Optional[float] = None,
+                  digest_window: Optional[float] = None):
+        """Replace all of a subscriber's watches with symbols at (period, timeframe); see watch for the settings"""
+        settings = self._subscription(email, alert_distance, digest_window)
+        targets = {(symbol, timeframe, period) for symbol in symbols}
+        with self._lock:
+            for target in [target for target, subscribers in self._watched.items()
+                           if subscriber in subscribers and target not in targets]:
+                self._remove_subscription(target, subscriber)
+            for target in targets:
+                self._watched.setdefault(target, {})[subscriber] = dict(settings)
+    
+    def unwatch(self, symbol: str, subscriber: str = DEFAULT_SUBSCRIBER):
+        """Stop a subscriber's watches on a symbol; the symbol stops being polled once nobody watches it"""
+        with self._lock:
+            for target in [target for target in self._watched if target[0] == symbol]:
+                self._remove_subscription(target, subscriber)
+    
+    def unsubscribe(self, subscriber: str):
+        """Drop all of a subscriber's watches and alerts"""
+        with self._lock:
+            for target in [target for target, subscribers in self._watched.items() if subscriber in subscribers]:
+                self._remove_subscription(target, subscriber)
+            self._alerts.pop(subscriber, None)
+    
+    def get_watched(self, subscriber: Optional[str] = None) -> List[str]:
+        """Watched symbols, of every subscriber or only of subscriber"""
+        with self._lock:
+            return list(dict.fromkeys(target[0] for target, subscribers in self._watched.items()
+                                      if subscriber is None or subscriber in subscribers))
+    
+    def start(self):
+        """Start the polling thread (no-op if already running)"""
+        if self._thread and self._thread.is_alive():
+            return
+        
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="zone-monitor", daemon=True)
+        self._thread.start()
+    
+    def stop(self, timeout: Optional[float] = None):
+        """Stop the polling thread"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout)
+    
+    def is_running(self) -> bool:
+        return bool(self._thread and self._thread.is_alive())
+    
+    def run_once(self) -> List[Dict]:
+        """
+        Poll every watched symbol once
+        
+        Returns:
+            List of alerts raised by this poll
+        """
+        self._drop_inactive_subscribers()
+        with self._lock:
+            watched = {target: dict(subscribers) for target, subscribers in self._watched.items()}
+        
+        try:
+            prices = self.data_manager.get_latest_prices(list(dict.fromkeys(target[0] for target in watched)))
+        except Exception:
+            prices = {}
+        
+        checked = {}  # (symbol, timeframe, period) -> current price, for watches whose zones are up to date
+        for target in watched:
+            try:
+                checked[target] = self._update_zones(target, prices.get(target[0]))
+            except Exception as e:
+                self._set_status(target, {'symbol': target[0], 'timeframe': target[1], 'error': str(e),
+                                          'updated_at': datetime.now().isoformat()})
+        
+        # One batched proximity query at the widest distance any subscriber uses, then
+        # each subscriber gets the zones within its own distance
+        widest = max((settings['alert_distance'] for subscribers in watched.values()
+                      for settings in subscribers.values()), default=self.alert_distance)
+        nearby = self._zone_index.query_many(checked, widest)
+        
+        new_alerts = []
+        for target, current_price in checked.items():
+            self._set_status(target, self._zone_status(target, current_price))
+            for subscriber, settings in watched[target].items():
+                in_range = [(zone, distance_pct) for zone, distance_pct in nearby.get(target, [])
+                            if distance_pct <= settings['alert_distance']]
+                new_alerts.extend(self._check_alerts(target[0], current_price, in_range, subscriber, settings))
+        
+        self.last_poll = datetime.now()
+        return new_alerts
+    
+    def get_status(self, subscriber: Optional[str] = None) -> List[Dict]:
+        """Latest result per watch, of every subscriber or only of subscriber: price, nearest zone and distance, or error"""
+        with self._lock:
+            return [dict(self._status[target]) for target, subscribers in self._watched.items()
+                    if target in self._status and (subscriber is None or subscriber in subscribers)]
+    
+    def get_alerts(self, limit: Optional[int] = None, subscriber: Optional[str] = None) -> List[Dict]:
+        """Most recent alerts, of every subscriber or only of subscriber, oldest first"""
+        with self._lock:
+            if subscriber is None:
+                alerts = sorted((alert for alerts in self._alerts.values() for alert in alerts),
+                                key=lambda alert: alert['timestamp'])
+            else:
+                alerts = self._alerts.get(subscriber, [])
+            alerts = alerts[-limit:] if limit else alerts
+            return [dict(alert) for alert in alerts]
+    
+    def _run(self):
+        while not self._stop_event.is_set():
+            started = time.monotonic()
+            try:
+                self.run_once()
+                self.last_error = None
+            except Exception as e:
+                # Keep polling; a failed poll must not end the thread
+                self.last_error = f"{datetime.now().strftime('%H:%M:%S')}: {e}"
+            self._stop_event.wait(max(0.0, self.interval - (time.monotonic() - started)))
+    
+    def _update_zones(self, target: Tuple[str, str, str], price: Optional[float] = None) -> float:
+        """Fetch data and refresh a (symbol, timeframe, period) watch's zones in the zone index; returns the current price"""
+        symbol, timeframe, period = target
+        data = self.data_manager.get_stock_data(symbol, period, timeframe)
+        if data is None or data.empty:
+            raise ValueError(f"No data for {symbol}")
+        
+        with self._lock:
+            detector = self._detectors.setdefault(target, IncrementalZoneDetector())
+        zones = detector.update(data, timeframe)
+        with self._lock:
+            # The watch may have been dropped while its zones were being detected
+            if target in self._watched:
+                self._zone_index.set_zones(target, zones)
+        
+        return price if price is not None else float(data['Close'].iloc[-1])
+    
+    def _zone_status(self, target: Tuple[str, str, str], current_price: float) -> Dict:
+        """Status entry for a watch: price, zone count and nearest zone"""
+        status = {
+            'symbol': target[0],
+            'timeframe': target[1],
+            'price': current_price,
+            'zones': len(self._zone_index.get_zones(target)),
+            'nearest_zone_type': None,
+            'nearest_zone_level': None,
+            'distance_pct': None,
+            'updated_at': datetime.now().isoformat()
+        }
+        nearest = self._zone_index.nearest(target, current_price)
+        if nearest:
+            zone, distance_pct = nearest
+            status.update({
+                'nearest_zone_type': zone['type'],
+                'nearest_zone_level': float(zone['level']),
+                'distance_pct': distance_pct
+            })
+        
+        return status
+    
+    def _set_status(self, target: Tuple[str, str, str], status: Dict):
+        with self._lock:
+            if target in self._watched:
+                self._status[target] = status
+    
+    def _subscription(self, email: Optional[str], alert_distance: Optional[float],
+                      digest_window: Optional[float]) -> Dict:
+        return {
+            'email': email,
+            'alert_distance': self.alert_distance if alert_distance is None else alert_distance,
+            'digest_window': digest_window
+        }
+    
+    def _remove_subscription(self, target: Tuple[str, str, str], subscriber: str):
+        """Remove one subscriber from a watch, and the watch once it has none left (caller holds the lock)"""
+        subscribers = self._watched.get(target)
+        if subscribers is None:
+            return
+        subscribers.pop(subscriber, None)
+        if not subscribers:
+            del self._watched[target]
+            self._status.pop(target, None)
+            self._detectors.pop(target, None)
+            self._zone_index.remove(target)
+    
+    def _drop_inactive_subscribers(self):
+        """Unsubscribe subscribers that subscriber_alive reports gone, e.g. closed browser sessions"""
+        if self.subscriber_alive is None:
+            return
+        
+        with self._lock:
+            subscribers = {subscriber for watchers in self._watched.values() for subscriber in watchers}
+            subscribers.update(self._alerts)
+        for subscriber in subscribers:
+            if not self.subscriber_alive(subscriber):
+                self.unsubscribe(subscriber)
+    
+    def _check_alerts(self, symbol: str, current_price: float, nearby: List[Tuple[Dict, float]],
+                      subscriber: str, settings: Dict) -> List[Dict]:
+        """Record and send a subscriber's alerts for the (zone, distance %) pairs in range, respecting the cooldown"""
+        recipient = settings['email']
+        new_alerts = []
+        
+        for zone, distance_pct in nearby:
+            now = datetime.now()
+            # Cooldowns are per recipient, or per subscriber for watches that aren't emailed
+            if not self.alert_store.try_acquire(symbol, zone['type'], zone['level'], self.cooldown, now,
+                                                recipient=recipient or subscriber):
+                continue
+            
+            alert_message = f"ALERT: {symbol} is {distance_pct:.2f}% away from {zone['type']} zone at ${zone['level']:.2f}"
+            alert_data = {
+                'timestamp': now.isoformat(),
+                'symbol': symbol,
+                'message': alert_message,
+                'zone_type': zone['type'],
+                'zone_level': zone['level'],
+                'current_price': current_price,
+                'distance_pct': distance_pct,
+                'recipient': recipient,
+                'email_sent': False
+            }
+            
+            if recipient:
+                try:
+                    alert_data['email_sent'] = self.notification_manager.send_alert(
+                        alert_message, symbol, zone, current_price,
+                        recipient=recipient, digest_window=settings['digest_window'])
+                except Exception:
+                    pass
+            
+            self.alert_store.record_alert(alert_data)
+            with self._lock:
+                alerts = self._alerts.setdefault(subscriber, [])
+                alerts.append(alert_data)
+                # Keep only the most recent alerts to avoid memory issues
+                del alerts[:-self.max_alerts]
+            new_alerts.append(alert_data)
+        
+        return new_alerts
+
+def main():
+    parser = argparse.ArgumentParser(description="Monitor stocks for demand/supply zone alerts")
+    parser.add_argument("symbols", nargs="+", help="Ticker symbols, e.g. RELIANCE.NS AAPL")
+    parser.add_argument("--timeframe", default="1d", help="Zone timeframe (default: 1d)")
+    parser.add_argument("--period", default="1y", help="History used for zone detection (default: 1y)")
+    parser.add_argument("--interval", type=float, default=30.0, help="Seconds between polls (default: 30)")
+    parser.add_argument("--alert-distance", type=float, default=1.0,
+                        help="Alert when price is within this %% of a zone (default: 1.0)")
+    parser.add_argument("--email", help="Send alert emails to this address")
+    parser.add_argument("--digest-window", type=float, default=60.0,
+                        help="Combine alerts raised within this many seconds into one email, 0 to send each (default: 60)")
+    parser.add_argument("--once", action="store_true", help="Poll once and exit")
+    args = parser.parse_args()
+    
+    monitor = ZoneMonitor(interval=args.interval, alert_distance=args.alert_distance, alert_store=AlertStore())
+    monitor.notification_manager.digest_window = args.digest_window
+    monitor.subscribe(DEFAULT_SUBSCRIBER, args.symbols, args.timeframe, args.period, email=args.email)
+    
+    try:
+        while True:
+            started = time.monotonic()
+            for alert in monitor.run_once():
+                print(f"[{alert['timestamp']}] {alert['message']}")
+            for status in monitor.get_status():
+                if status.get('error'):
+                    print(f"{status['symbol']}: {status['error']}")
+            if args.once:
+                break
+            time.sleep(max(0.0, args.interval - (time.monotonic() - started)))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        monitor.notification_manager.close()  # Send queued alert emails before exiting
+
+if __name__ == "__main__":
+    main()